@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for downloader reuse.
+
+Compares building a fresh downloader and YoutubeDL context per job (the
+old behaviour) with leasing a pooled downloader and reconfiguring its
+context for the next job. No network access is needed.
+
+    python benchmarks/bench_downloader_pool.py --jobs 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.downloader_pool import DownloaderPool  # noqa: E402
+from src.modules.format_policy import build_transcribe_audio_spec  # noqa: E402
+from src.modules.video_downloader_extended import create_downloader  # noqa: E402
+
+PLATFORMS = ('youtube', 'tiktok', 'x', 'facebook')
+SPECS = ('bestvideo+bestaudio/best', 'best[height<=720]/best', build_transcribe_audio_spec())
+
+
+def fresh_job(i):
+    downloader = create_downloader(PLATFORMS[i % len(PLATFORMS)])
+    downloader._ydl(SPECS[i % len(SPECS)], outtmpl=f"bench_{i}.%(ext)s")
+    downloader.close()
+
+
+def pooled_job(pool, i):
+    with pool.lease(PLATFORMS[i % len(PLATFORMS)]) as downloader:
+        downloader._ydl(SPECS[i % len(SPECS)], outtmpl=f"bench_{i}.%(ext)s")
+
+
+def timed(label, jobs, fn):
+    start = time.perf_counter()
+    for i in range(jobs):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:32} {elapsed:8.3f} s  {elapsed / jobs * 1e3:8.2f} ms/job")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downloader pool micro-benchmark")
+    parser.add_argument("--jobs", type=int, default=200, help="Number of simulated jobs (default: 200)")
+    args = parser.parse_args()
+
+    fresh = timed("fresh downloader + YoutubeDL", args.jobs, fresh_job)
+    with DownloaderPool() as pool:
+        pooled = timed("pooled lease + reconfigure", args.jobs, lambda i: pooled_job(pool, i))
+        print(f"Pool created {pool.created} downloader(s) for {pool.leases} lease(s)")
+    print(f"Speed-up: {fresh / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Search latency benchmark for the transcript index.
+
+Fills a throwaway FTS5 index with synthetic transcripts (Whisper-sized
+segments drawn from a Zipf-like vocabulary) and times ranked searches for
+stop words, common and rare words and phrases. No network access or Whisper model
+is needed.
+
+    python benchmarks/bench_transcript_index.py --transcripts 100000 --segments 20
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.transcript_index import TranscriptIndex  # noqa: E402
+
+
+def make_vocabulary(rng, size):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_segments(rng, vocabulary, weights, count):
+    start = 0.0
+    segments = []
+    for _ in range(count):
+        length = rng.uniform(2, 8)
+        words = rng.choices(vocabulary, cum_weights=weights, k=rng.randint(8, 25))
+        segments.append({'start': start, 'end': start + length, 'text': ' '.join(words)})
+        start += length
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", type=int, default=100_000)
+    parser.add_argument("--segments", type=int, default=20, help="Segments per transcript")
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = TranscriptIndex(os.path.join(tmp, 'catalog.db'))
+        # Throwaway database: skip the per-transcript fsync so building the corpus takes seconds
+        index._connect().execute("PRAGMA synchronous=OFF")
+        started = time.perf_counter()
+        for i in range(args.transcripts):
+            transcript_id = index.begin(os.path.join(tmp, f"t{i}.txt"), platform='youtube', media_id=f"{i:011d}")
+            index.add_segments(transcript_id, make_segments(rng, vocabulary, weights, args.segments))
+        build = time.perf_counter() - started
+        size = os.path.getsize(os.path.join(tmp, 'catalog.db'))
+        print(f"Indexed {args.transcripts:,} transcripts ({args.transcripts * args.segments:,} segments) "
+              f"in {build:.1f}s, {size / 2**20:.1f} MiB")
+
+        cases = {
+            # Top-ranked words behave like stop words: every match is scored before the top N is known
+            'stop word': lambda: vocabulary[rng.randint(0, 9)],
+            'common word': lambda: vocabulary[rng.randint(100, 1000)],
+            'rare word': lambda: vocabulary[rng.randint(len(vocabulary) // 2, len(vocabulary) - 1)],
+            'two words': lambda: f"{vocabulary[rng.randint(0, 500)]} {vocabulary[rng.randint(0, 500)]}",
+            'phrase': lambda: f'"{vocabulary[rng.randint(0, 50)]} {vocabulary[rng.randint(0, 50)]}"',
+        }
+        for name, query in cases.items():
+            timings = []
+            for _ in range(args.queries):
+                q = query()
+                started = time.perf_counter()
+                index.search(q, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(f"{name:<12} median {statistics.median(timings):7.2f} ms   "
+                  f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for URL routing and batch deduplication.
+
+Compares the precompiled router with the old substring-based
+detect_platform on a synthetic batch of URL variants.
+
+    python benchmarks/bench_url_router.py --count 2000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.modules.url_router import dedupe, route  # noqa: E402
+
+TEMPLATES = [
+    "https://www.youtube.com/watch?v={yt}",
+    "https://youtu.be/{yt}?si=tracking{n}",
+    "https://m.youtube.com/watch?v={yt}&feature=share",
+    "https://www.youtube.com/shorts/{yt}",
+    "https://www.facebook.com/watch/?v={num}",
+    "https://m.facebook.com/page/videos/{num}/?fbclid=IwAR{n}",
+    "https://fb.watch/{code}/",
+    "https://www.tiktok.com/@user{n}/video/{num}?is_from_webapp=1",
+    "https://vm.tiktok.com/{code}/",
+    "https://x.com/user{n}/status/{num}?s=20",
+    "https://twitter.com/i/web/status/{num}",
+    "https://www.netflix.com/title/{num}",
+]
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+
+
+def legacy_detect_platform(url):
+    if "facebook.com" in url:
+        return "facebook"
+    elif "youtube.com" in url or "youtu.be" in url:
+        return "youtube"
+    elif "tiktok.com" in url:
+        return "tiktok"
+    elif "twitter.com" in url or "x.com" in url:
+        return "x"
+    return None
+
+
+def make_urls(count, unique_ratio, seed=42):
+    rng = random.Random(seed)
+    pool_size = max(1, int(count * unique_ratio))
+    ids = [''.join(rng.choice(ALPHABET) for _ in range(11)) for _ in range(min(pool_size, 100_000))]
+    urls = []
+    for i in range(count):
+        media = rng.randrange(pool_size)
+        urls.append(rng.choice(TEMPLATES).format(
+            yt=ids[media % len(ids)], num=10 ** 15 + media, code=ids[media % len(ids)][:8], n=i % 97))
+    return urls
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:32} {elapsed:8.2f} s  {count / elapsed / 1e6:6.2f} M URLs/s  {elapsed / count * 1e9:7.0f} ns/URL")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL router micro-benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of URLs (default: 1,000,000)")
+    parser.add_argument("--unique", type=float, default=0.5, help="Fraction of distinct media (default: 0.5)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.count:,} URLs...")
+    urls = make_urls(args.count, args.unique)
+
+    timed("legacy substring detect", args.count, lambda: [legacy_detect_platform(u) for u in urls])
+    timed("route() parse + canonicalize", args.count, lambda: [route(u) for u in urls])
+    kept = timed("dedupe() batch", args.count, lambda: sum(1 for _ in dedupe(urls)))
+    print(f"Kept {kept:,} of {args.count:,} URLs after canonical deduplication")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,105 @@
 
 import argparse
 import re
-from src.modules.video_downloader_extended import FacebookVideoDownloader, YouTubeDownloader, TikTokDownloader, XDownloader
-
-def detect_platform(url):
-    if "facebook.com" in url:
-        return "facebook"
-    elif "youtube.com" in url or "youtu.be" in url:
-        return "youtube"
-    elif "tiktok.com" in url:
-        return "tiktok"
-    elif "twitter.com" in url or "x.com" in url:
-        return "x"
-    else:
-        return None
-
-def get_downloader(platform):
-    if platform == "facebook":
-        return FacebookVideoDownloader()
-    elif platform == "youtube":
-        return YouTubeDownloader()
-    elif platform == "tiktok":
-        return TikTokDownloader()
-    elif platform == "x":
-        return XDownloader()
-    else:
-        raise ValueError(f"Unsupported platform: {platform}")
+import sys
+import threading
+import time
+from functools import partial
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from src.modules.downloader_pool import DownloaderPool
+from src.modules.sessions import SessionManager, parse_cookie_files
+from src.modules.format_policy import FORMAT_POLICIES, TransferReport, parse_platform_policies, resolve_policy
+from src.modules.time_ranges import build_ranges
+from src.modules.url_router import detect_platform, download_url, resolve_short, route
+from src.modules.expansion import DEFAULT_ARCHIVE, DownloadArchive, PlaylistExpander
+from src.modules.sync_state import DEFAULT_STATE, SyncState
+from src.modules.content_store import ContentStore
+from src.modules.audio_archive import AUDIO_PROFILES, DEFAULT_AUDIO_PROFILE
+from src.modules.catalog import DEFAULT_CATALOG, Catalog, print_artifacts
+from src.modules.transcript_index import TranscriptIndex, print_hits
+from src.modules.model_select import ModelSelector, TranscribeHistory
+from src.modules.transcript_formats import (
+    DEFAULT_SEGMENT_FORMATS, SEGMENT_FORMATS, STREAM_PART_MINUTES, parse_segment_formats,
+)
+from src.modules.quota import DEFAULT_MIN_FREE, QuotaManager
+from src.modules.job_store import (
+    DEFAULT_LEASE, DEFAULT_MAX_ATTEMPTS, Heartbeat, default_worker_id, in_shard, open_job_store, parse_shard,
+)
+from src.modules.ingest import STDIN, IngestStats, SeenSet, iter_lines, open_source, stream_jobs, windows
+from src.modules.planner import build_plan, print_plan, probe_entry
+from src.modules.media_record import MediaRecord
+from src.modules.admission import AdmissionPolicy, DEFER, REJECT, parse_size
+from src.modules.scheduler import (
+    SCHEDULE_POLICIES, Job, LatencyTracker, compare_policies, make_cost_fn, order_jobs,
+    parse_duration, parse_platform_weights, print_comparison,
+)
 
-def process_url(url, mode, transcribe, model, keep_audio):
+COMMANDS = ("sync", "enqueue", "worker", "list", "search")
+WORKER_POLL_SECONDS = 10
+
+def process_url(url, mode, transcribe, model, keep_audio, policy=None, policy_overrides=None, report=None,
+                min_abr=None, ranges=None, info=None, platform=None, pool=None,
+                audio_profile=DEFAULT_AUDIO_PROFILE, audio_report=None, segment_formats=DEFAULT_SEGMENT_FORMATS,
+                selector=None, deadline_at=None, live_segments=False):
     url = url.strip()
     if not url:
-        return
-    platform = detect_platform(url)
-    if not platform:
-        print(f"❌ Could not detect platform from URL: {url}")
-        return
+        return False
+    if platform is None:
+        routed = route(url)
+        if not routed:
+            print(f"❌ Could not detect platform from URL: {url}")
+            return False
+        platform, url = routed.platform, download_url(routed)
     print(f"▶️ Processing [{platform.upper()}] {url}")
-    downloader = get_downloader(platform)
-    if transcribe:
-        downloader.transcribe(url, model_name=model, keep_audio=keep_audio)
+    pool = pool or DownloaderPool()
+    if selector is not None and deadline_at is not None:
+        selector = selector.until(deadline_at)
+    with pool.lease(platform) as downloader:
+        if mode == "combined":
+            video_path, transcript_path = downloader.download_and_transcribe(
+                url, model_name=model, keep_audio=keep_audio, policy=resolve_policy(platform, policy, policy_overrides),
+                report=report, ranges=ranges, info=info, audio_profile=audio_profile, audio_report=audio_report,
+                segment_formats=segment_formats, selector=selector, live_segments=live_segments)
+            return bool(video_path and transcript_path)
+        elif transcribe:
+            return bool(downloader.transcribe(url, model_name=model, keep_audio=keep_audio, report=report,
+                                              min_abr=min_abr, ranges=ranges, info=info,
+                                              audio_profile=audio_profile, audio_report=audio_report,
+                                              segment_formats=segment_formats, selector=selector,
+                                              live_segments=live_segments))
+        else:
+            return bool(downloader.download(url, mode=mode, policy=resolve_policy(platform, policy, policy_overrides),
+                                            report=report, ranges=ranges, info=info))
+
+def list_outputs(catalog, url=None, kind=None, limit=50):
+    if url:
+        routed = route(url)
+        if routed:
+            artifacts = catalog.find(kind=kind, platform=routed.platform, media_id=routed.media_id, limit=limit)
+        else:
+            artifacts = catalog.find(kind=kind, source_url=url.strip(), limit=limit)
+        # Looking a video up counts as a use: it moves to the back of the eviction order
+        catalog.touch([a.path for a in artifacts])
+    else:
+        artifacts = catalog.find(kind=kind, limit=limit)
+    if not artifacts:
+        print("ℹ️ No catalogued outputs found")
     else:
-        downloader.download(url, mode=mode)
+        print_artifacts(artifacts)
+        totals = catalog.totals()
+        print("📦 Catalog: " + ", ".join(f"{count} {kind}" for kind, (count, _) in sorted(totals.items())))
+    catalog.close()
+
+def search_transcripts(index, query, limit=50):
+    started = time.perf_counter()
+    hits = index.search(query, limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    if hits:
+        print_hits(hits)
+    transcripts, segments = index.count()
+    print(f"🔎 {len(hits)} hit(s) in {elapsed:.1f} ms over {transcripts} transcript(s), {segments} segment(s)")
+    index.close()
 
 def main():
     parser = argparse.ArgumentParser(
@@ -49,30 +108,321 @@ def main():
 Examples:
   python downloader_cli.py "https://www.youtube.com/watch?v=xyz123"
   python downloader_cli.py --file urls.txt --mode audio --transcribe --model small
+  python downloader_cli.py "https://youtu.be/xyz123" --transcribe --start 10:00 --end 15:00
+  python downloader_cli.py sync --file channels.txt --transcribe
+  python downloader_cli.py enqueue --file urls.txt --job-store /mnt/shared/jobs.db
+  python downloader_cli.py worker --job-store /mnt/shared/jobs.db --transcribe --workers 2
+  python downloader_cli.py list "https://youtu.be/xyz123"
+  python downloader_cli.py search "machine learning"
+
+Commands:
+  sync     Treat the URLs as channels/profiles and only fetch videos newer than the last sync
+  enqueue  Put the jobs into --job-store instead of running them
+  worker   Lease jobs from --job-store and run them (run one per host, any number of hosts)
+  list     Show catalogued outputs, newest first (all, or those of the given URL)
+  search   Full-text search over transcripts; the URL argument is the query
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
 
-    parser.add_argument("url", nargs="?", help="Video URL (YouTube, Facebook, TikTok, or X)")
-    parser.add_argument("--file", help="Path to text file containing multiple URLs (one per line)")
-    parser.add_argument("--mode", choices=["video", "audio", "best"], default="video", help="Download mode (default: video)")
+    parser.add_argument("url", nargs="?", help="Video URL (YouTube, Facebook, TikTok, or X), or - to read URLs from stdin")
+    parser.add_argument("--file", help="Path to text file containing multiple URLs (one per line), or - for stdin")
+    parser.add_argument("--mode", choices=["video", "audio", "best", "combined"], default="video",
+                        help="Download mode; 'combined' downloads the video once and transcribes it locally (default: video)")
     parser.add_argument("--transcribe", action="store_true", help="Transcribe audio after download")
-    parser.add_argument("--model", default="base", help="Whisper model to use (default: base)")
+    parser.add_argument("--model", default="base",
+                        help="Whisper model to use; 'cascade' or DRAFT:FINAL (e.g. tiny:large) runs the fast model "
+                             "and re-runs only low-confidence segments on the large one; 'auto' picks the most accurate "
+                             "model that meets --deadline/--max-cpu from measured speed on this host (default: base)")
+    parser.add_argument("--deadline", help="Wall-clock time allowed per transcription for --model auto, e.g. 20m "
+                                           "(default: the media's duration; deadline= in the batch file also counts)")
     parser.add_argument("--keep-audio", action="store_true", help="Keep audio file after transcription")
+    parser.add_argument("--audio-profile", choices=AUDIO_PROFILES, default=DEFAULT_AUDIO_PROFILE,
+                        help="Format of kept audio: 24 kbps mono Opus, the original stream, or 192 kbps MP3 (default: opus)")
+    parser.add_argument("--transcript-formats", metavar="LIST",
+                        help=f"Timestamped outputs written next to the .txt as segments are transcribed: "
+                             f"comma-separated {', '.join(SEGMENT_FORMATS)}, or none (default: all)")
+    parser.add_argument("--live-segments", action="store_true",
+                        help=f"Transcribe in parts of at most {STREAM_PART_MINUTES} minutes so the segment files "
+                             f"can be followed while a long video runs (more cuts between parts)")
+    parser.add_argument("--format-policy", choices=sorted(FORMAT_POLICIES), help="Video format policy for all platforms (default: per-platform)")
+    parser.add_argument("--min-audio-kbps", type=int, default=None, help="Quality floor for transcription audio streams (default: 32)")
+    parser.add_argument("--platform-policy", action="append", metavar="PLATFORM=POLICY", help="Override the format policy for one platform (repeatable)")
+    parser.add_argument("--start", help="Only process from this timestamp (SS, MM:SS or HH:MM:SS)")
+    parser.add_argument("--end", help="Only process up to this timestamp")
+    parser.add_argument("--ranges", help="Comma separated list of START-END clips, e.g. 10:00-15:00,1:02:00-1:05:30")
+    parser.add_argument("--plan", action="store_true", help="Dry run: probe all URLs and report size, duration and Whisper CPU estimates")
+    parser.add_argument("--preflight", action="store_true", help="Probe all URLs first, report the plan, then download reusing the metadata")
+    parser.add_argument("--probe-workers", type=int, default=8, help="Concurrent metadata probes for --plan/--preflight (default: 8)")
+    parser.add_argument("--schedule", choices=SCHEDULE_POLICIES, default="fifo",
+                        help="Batch order: fifo, sjf (shortest first), wfq (weighted fair per platform), edf (earliest deadline) (default: fifo)")
+    parser.add_argument("--compare-schedules", action="store_true", help="Simulate every schedule policy and report mean/tail completion latency")
+    parser.add_argument("--platform-weight", action="append", metavar="PLATFORM=WEIGHT", help="Share of the batch for a platform under --schedule wfq (repeatable)")
+    parser.add_argument("--max-duration", help="Per-job duration budget, e.g. 90m or 3h (bare numbers are minutes)")
+    parser.add_argument("--max-filesize", help="Per-job download size budget, e.g. 500M or 4G")
+    parser.add_argument("--max-cpu", help="Per-job estimated Whisper CPU budget, e.g. 2h")
+    parser.add_argument("--oversize", choices=[DEFER, REJECT], default=DEFER,
+                        help="What to do with jobs over budget: defer to the end of the batch or reject (default: defer)")
+    parser.add_argument("--cookies", action="append", metavar="[PLATFORM=]FILE",
+                        help="Netscape cookie file for authenticated downloads, shared by all workers and saved back after the run (repeatable)")
+    parser.add_argument("--playlist-limit", type=int, default=None,
+                        help="Max new videos taken from each playlist/channel/profile URL (default: all)")
+    parser.add_argument("--no-expand", action="store_true",
+                        help="Pass playlist/channel/profile URLs to yt-dlp as-is instead of expanding them into jobs")
+    parser.add_argument("--no-resolve-short", action="store_true",
+                        help="Do not follow fb.watch/vm.tiktok.com redirects before deduplication (short links then never match their full URLs)")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE, metavar="FILE",
+                        help="Record finished downloads and skip archived videos, also during expansion (default file: output/download_archive.txt)")
+    parser.add_argument("--sync-state", default=DEFAULT_STATE, metavar="FILE",
+                        help="High-water marks used by the sync command (default: output/sync_state.json)")
+    parser.add_argument("--job-store", metavar="URL",
+                        help="Shared job store for enqueue/worker: SQLite file path (may be on NFS) or redis://host:port/db")
+    parser.add_argument("--worker-id", default=default_worker_id(), help="Worker name in the job store (default: host:pid)")
+    parser.add_argument("--lease", type=int, default=DEFAULT_LEASE,
+                        help="Seconds a leased job stays reserved without a heartbeat (default: 300)")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help="Attempts before a failing job is marked failed (default: 3)")
+    parser.add_argument("--wait", action="store_true", help="Keep a worker polling for new jobs when the store is empty")
+    parser.add_argument("--shard", metavar="I/N", help="Only process jobs whose canonical ID hashes to shard I of N")
+    parser.add_argument("--window", type=int, default=500,
+                        help="URLs probed, scheduled and admitted together when streaming a list (default: 500)")
+    parser.add_argument("--dedupe-limit", type=int, default=1_000_000,
+                        help="Exact duplicate tracking up to this many URLs, then a Bloom filter (default: 1000000)")
+    parser.add_argument("--no-content-store", action="store_true",
+                        help="Keep outputs as plain files instead of storing them once by content hash under output/store")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG, metavar="FILE",
+                        help="SQLite index of every output file (default: output/catalog.db)")
+    parser.add_argument("--max-output", metavar="SIZE",
+                        help="Output quota, e.g. 200G: least recently used audio, then video, is evicted in the background (transcripts are kept)")
+    parser.add_argument("--min-free", metavar="SIZE", default="1G",
+                        help="Free disk space kept in reserve; downloads that would dip below it wait for eviction or are skipped (default: 1G)")
+    parser.add_argument("--kind", choices=["video", "audio", "transcript"], help="list: only this kind of output")
+    parser.add_argument("--limit", type=int, default=50, help="list/search: max rows shown (default: 50)")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs processed concurrently, sharing pooled downloaders (default: 1)")
+    parser.add_argument("--bandwidth", type=float, default=50, help="Expected download bandwidth in Mbit/s for schedule estimates (default: 50)")
 
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    command = argv[0] if argv and argv[0] in COMMANDS else None
+    args = parser.parse_args(argv[1:] if command else argv)
+    sync = command == "sync"
+    if sync and args.no_expand:
+        parser.error("sync needs playlist/channel expansion; drop --no-expand")
+    if command in ("enqueue", "worker") and not args.job_store:
+        parser.error(f"{command} needs --job-store")
+    if command == "list":
+        list_outputs(Catalog(args.catalog), args.url, args.kind, args.limit)
+        return
+    if command == "search":
+        if not args.url:
+            parser.error("search needs a query")
+        search_transcripts(TranscriptIndex(args.catalog), args.url, args.limit)
+        return
 
-    if args.file:
+    try:
+        policy_overrides = parse_platform_policies(args.platform_policy)
+        ranges = build_ranges(args.start, args.end, args.ranges)
+        platform_weights = parse_platform_weights(args.platform_weight)
+        cookie_files = parse_cookie_files(args.cookies)
+        shard = parse_shard(args.shard) if args.shard else None
+        max_output = parse_size(args.max_output) if args.max_output else None
+        min_free = parse_size(args.min_free) if args.min_free else DEFAULT_MIN_FREE
+        segment_formats = parse_segment_formats(args.transcript_formats)
+        deadline = parse_duration(args.deadline) if args.deadline else None
+        transcribing = args.transcribe or args.mode == "combined"
+        max_cpu = parse_duration(args.max_cpu) if args.max_cpu else None
+        selector = ModelSelector(TranscribeHistory(args.catalog), workers=args.workers, deadline=deadline,
+                                 cpu_budget=max_cpu)
+        admission = AdmissionPolicy(
+            max_duration=parse_duration(args.max_duration) if args.max_duration else None,
+            max_filesize=parse_size(args.max_filesize) if args.max_filesize else None,
+            max_cpu=max_cpu,
+            model=args.model if transcribing else None,
+            oversize=args.oversize,
+            selector=selector,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    transcribe_only = args.transcribe and args.mode != "combined"
+    report = TransferReport("Transcription audio" if transcribe_only else "Format policy")
+    audio_report = TransferReport(f"Kept audio ({args.audio_profile})", action="stored")
+    sessions = SessionManager(cookie_files)
+    # Sync always keeps an archive: it is what makes re-listed, already fetched videos free
+    archive_path = args.archive or (DEFAULT_ARCHIVE if sync else None)
+    archive = DownloadArchive(archive_path) if archive_path else None
+    sync_state = SyncState(args.sync_state) if sync else None
+    store = open_job_store(args.job_store, args.max_attempts) if command in ("enqueue", "worker") else None
+    content_store = None if args.no_content_store else ContentStore()
+    catalog = Catalog(args.catalog)
+    quota = QuotaManager(catalog, max_bytes=max_output, min_free=min_free)
+    pool = DownloaderPool(sessions=sessions, archive=archive, store=content_store, catalog=catalog,
+                          index=TranscriptIndex(args.catalog), quota=quota)
+    expander = None if args.no_expand else PlaylistExpander(sessions, archive, limit=args.playlist_limit,
+                                                            sync=sync_state)
+    options = dict(policy=args.format_policy, policy_overrides=policy_overrides, report=report,
+                   min_abr=args.min_audio_kbps, ranges=ranges, pool=pool,
+                   audio_profile=args.audio_profile, audio_report=audio_report, segment_formats=segment_formats,
+                   selector=selector, live_segments=args.live_segments)
+
+    if command == "worker":
+        # Workers take their jobs from the store, not from a list
+        lines = []
+    elif args.file:
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    process_url(line.strip(), args.mode, args.transcribe, args.model, args.keep_audio)
+            lines = iter_lines(open_source(args.file))
         except FileNotFoundError:
             print(f"❌ File not found: {args.file}")
+            return
+    elif args.url == STDIN:
+        lines = iter_lines(open_source(STDIN))
     elif args.url:
-        process_url(args.url, args.mode, args.transcribe, args.model, args.keep_audio)
+        lines = [args.url.strip()]
     else:
         print("❌ Please provide a URL or use --file to specify a list of URLs.")
+        return
+    # Lines are read, parsed and deduplicated lazily: the first job starts before
+    # the rest of the list is read. Variants of the same media (youtu.be, m.,
+    # shorts/, tracking params) collapse into one job
+    stats = IngestStats()
+    jobs = stream_jobs(lines, SeenSet(exact_limit=args.dedupe_limit), stats,
+                       expand=expander.expand if expander else None,
+                       resolve=None if args.no_resolve_short else resolve_short,
+                       # Listed twice: the copy is handled by the job already taken
+                       dropped=sync_state.dropped if sync_state else None)
+    if shard is not None:
+        # Static split without a coordinator: every host reads the same list
+        jobs = (job for job in jobs if in_shard(job, shard))
+
+    # Any ordering other than file order needs duration/size from the probe
+    # and admission control must see the metadata before any bytes move
+    needs_metadata = (args.plan or args.preflight or args.compare_schedules
+                      or args.schedule != "fifo" or admission.active)
+    probe = partial(probe_entry, detect_platform=detect_platform, pool=pool,
+                    mode=args.mode, transcribe=args.transcribe,
+                    policy_for=lambda platform: resolve_policy(platform, args.format_policy, policy_overrides),
+                    min_abr=args.min_audio_kbps, ranges=ranges)
+    cost = make_cost_fn(args.bandwidth, args.model if transcribing else None, selector)
+    deferred = []
+
+    def plan_window(window):
+        # Each window of the stream is probed, ordered and admitted on its own
+        print(f"🔎 Probing {len(window)} URL(s) with {args.probe_workers} workers...")
+        entries = build_plan([job.url for job in window], probe, workers=args.probe_workers)
+        print_plan(entries)
+        planned = [Job.from_plan_entry(entry, index=job.index, weight=job.weight, deadline=job.deadline)
+                   for job, entry in zip(window, entries) if entry.ok]
+        if sync_state is not None:
+            # Dead or unsupported counts as a failed attempt towards giving up on the video
+            for job, entry in zip(window, entries):
+                if not entry.ok:
+                    sync_state.done(job.url, ok=False)
+        if args.compare_schedules:
+            print_comparison(compare_policies(planned, cost, platform_weights))
+        planned = order_jobs(planned, args.schedule, cost, platform_weights)
+        if admission.active:
+            accepted, later, rejected = admission.split(planned)
+            print(f"🚦 Admission: {len(accepted)} accepted, {len(later)} deferred, {len(rejected)} rejected")
+            # The low-priority lane only starts once every accepted job is done, long after
+            # the probe: by then its signed format URLs are stale, so only the estimates are kept
+            for job in later:
+                job.info = job.info.without_formats() if isinstance(job.info, MediaRecord) else None
+            deferred.extend(later)
+            planned = accepted
+            if sync_state is not None:
+                for job in rejected:
+                    sync_state.rejected(job.url)
+        return [] if args.plan else planned
+
+    if needs_metadata:
+        jobs = chain.from_iterable(plan_window(window) for window in windows(jobs, args.window))
+
+    tracker = LatencyTracker()
+
+    def run_job(job):
+        ok = False
+        try:
+            # A deadline= in the batch file counts from the start of the batch
+            deadline_at = tracker.started + job.deadline if job.deadline is not None else None
+            if isinstance(job.info, MediaRecord) and job.info.expired():
+                # Probed long ago (late in a large --preflight window): extract again, keep the estimates
+                job.info = job.info.without_formats()
+            ok = process_url(job.url, args.mode, args.transcribe, args.model, args.keep_audio, info=job.info,
+                             platform=job.platform, deadline_at=deadline_at, **options)
+        except Exception as e:
+            print(f"❌ Failed to process {job.url}: {e}")
+        if sync_state is not None:
+            sync_state.done(job.url, ok)
+        tracker.done(job)
+        return ok
+
+    def work(worker_id):
+        # Each thread leases one job at a time, so nothing sits leased without a heartbeat
+        while True:
+            job = store.lease(worker_id, args.lease)
+            if job is None:
+                if not args.wait:
+                    return
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+            # Format URLs in a queued record are signed and may have expired: extract again
+            job.info = None
+            with Heartbeat(store, job.key, worker_id, args.lease):
+                ok = run_job(job)
+            store.complete(job.key, worker_id, ok, error=None if ok else "processing failed")
+
+    def run(jobs):
+        if args.workers <= 1:
+            for job in jobs:
+                run_job(job)
+            return
+        # Only a few jobs are handed to the executor ahead of the workers so
+        # the stream is consumed at the pace it is processed
+        slots = threading.BoundedSemaphore(args.workers * 2)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for job in jobs:
+                slots.acquire()
+                executor.submit(run_job, job).add_done_callback(lambda _: slots.release())
+
+    with pool:
+        if command == "worker":
+            worker_ids = [f"{args.worker_id}/{n}" for n in range(max(1, args.workers))]
+            print(f"👷 Worker {args.worker_id} pulling from {args.job_store} with {len(worker_ids)} thread(s)")
+            with ThreadPoolExecutor(max_workers=len(worker_ids)) as executor:
+                list(executor.map(work, worker_ids))
+            print(f"📊 Job store: {store.counts()}")
+        elif command == "enqueue":
+            added = sum(store.enqueue(window) for window in windows(chain(jobs, deferred), args.window))
+            print(f"📥 Enqueued {added} new job(s) into {args.job_store}; {store.counts()}")
+        else:
+            run(jobs)
+            if deferred and not args.plan:
+                print(f"⏸️ Running {len(deferred)} deferred job(s)")
+                run(deferred)
+    if store is not None:
+        store.close()
+    if expander is not None:
+        expander.close()
+        if expander.stats.collections:
+            print(expander.summary())
+    if sync_state is not None and not args.plan:
+        sync_state.commit()
+
+    if stats.duplicates:
+        print(f"🔁 Collapsed {stats.duplicates} duplicate URL(s)")
+
+    if len(tracker.completions) > 1:
+        print(tracker.summary(args.schedule))
+
+    if report.downloads:
+        print(report.summary())
+
+    if audio_report.downloads:
+        print(audio_report.summary())
+
+    if content_store is not None and (content_store.stored or content_store.deduplicated):
+        print(content_store.summary())
+
+    if quota.evicting or quota.evicted:
+        print(quota.summary())
 
 if __name__ == "__main__":
     main()
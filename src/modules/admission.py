@@ -0,0 +1,85 @@
+"""
+Admission control for batch jobs.
+
+Every job is checked against per-job budgets (duration, file size and
+estimated Whisper CPU time) using the probed metadata, before any media
+is downloaded. Jobs over budget are either deferred to a low-priority
+lane that runs after everything else, or rejected with a reason.
+"""
+
+from .cascade import cascade_rtf
+from .format_policy import human_bytes
+from .planner import WHISPER_CPU_RTF
+from .time_ranges import format_timestamp
+
+ACCEPT = 'accept'
+DEFER = 'defer'
+REJECT = 'reject'
+
+_SIZE_UNITS = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+def parse_size(value):
+    """Parse ``500M``, ``20G``, ``1.5T`` or a plain byte count."""
+    value = value.strip().lower().removesuffix('b').removesuffix('i')
+    unit = _SIZE_UNITS.get(value[-1:])
+    number = value[:-1] if unit else value
+    try:
+        return int(float(number) * (unit or 1))
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}") from None
+
+
+class AdmissionPolicy:
+    def __init__(self, max_duration=None, max_filesize=None, max_cpu=None, model=None, oversize=DEFER,
+                 selector=None):
+        self.max_duration = max_duration
+        self.max_filesize = max_filesize
+        self.max_cpu = max_cpu
+        self.model = model
+        self.oversize = oversize
+        self.selector = selector  # resolves --model auto and measured speeds
+
+    @property
+    def active(self):
+        return any(limit is not None for limit in (self.max_duration, self.max_filesize, self.max_cpu))
+
+    def violations(self, job):
+        reasons = []
+        live = job.info is not None and job.info.is_live
+        if live and (self.max_duration is not None or self.max_cpu is not None):
+            reasons.append("live stream has no bounded duration")
+        if self.max_duration is not None and job.duration and job.duration > self.max_duration:
+            reasons.append(f"duration {format_timestamp(job.duration)} > {format_timestamp(self.max_duration)}")
+        if self.max_filesize is not None and job.size and job.size > self.max_filesize:
+            reasons.append(f"size {human_bytes(job.size)} > {human_bytes(self.max_filesize)}")
+        if self.max_cpu is not None and self.model and job.duration:
+            if self.selector is not None:
+                cpu = job.duration * self.selector.planning_rtf(self.model, job.duration)
+            else:
+                cpu = job.duration * cascade_rtf(self.model, WHISPER_CPU_RTF)
+            if cpu > self.max_cpu:
+                reasons.append(f"estimated {self.model} CPU {format_timestamp(cpu)} > {format_timestamp(self.max_cpu)}")
+        return reasons
+
+    def check(self, job):
+        """Return ``(decision, reason)`` for a job."""
+        reasons = self.violations(job)
+        if not reasons:
+            return ACCEPT, None
+        return self.oversize, "; ".join(reasons)
+
+    def split(self, jobs):
+        """Partition jobs into ``(accepted, deferred, rejected)``, printing a line for each non-accepted job."""
+        accepted, deferred, rejected = [], [], []
+        for job in jobs:
+            decision, reason = self.check(job)
+            if decision == ACCEPT:
+                accepted.append(job)
+            elif decision == DEFER:
+                print(f"⏸️ Deferred to low-priority lane: {job.url} ({reason})")
+                deferred.append(job)
+            else:
+                print(f"⛔ Rejected: {job.url} ({reason})")
+                rejected.append(job)
+        return accepted, deferred, rejected
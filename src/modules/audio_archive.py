@@ -0,0 +1,86 @@
+"""
+Archival profiles for kept transcription audio.
+
+Audio downloaded for Whisper is kept in its original stream and only
+turned into an archival copy when ``keep_audio`` asks for it:
+
+* ``opus``     - mono Opus at 24 kbps, plenty for speech; streams that are
+                 already Opus are remuxed without decoding
+* ``original`` - the downloaded stream untouched (remuxed to audio-only
+                 Matroska if it came with video), never decoded
+* ``mp3``      - the former 192 kbps MP3
+
+Savings are reported against what the 192 kbps MP3 would have taken.
+"""
+
+import json
+import os
+import subprocess
+
+AUDIO_PROFILES = ('opus', 'original', 'mp3')
+DEFAULT_AUDIO_PROFILE = 'opus'
+
+OPUS_BITRATE = 24  # kbps, mono
+MP3_BITRATE = 192  # kbps, the previous format of kept audio
+
+
+def probe_streams(path):
+    """``(audio_codec, has_video)`` of a media file; ``(None, False)`` when ffprobe fails."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,codec_name", "-of", "json", path]
+    try:
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        streams = json.loads(output).get('streams', [])
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None, False
+    audio = next((s.get('codec_name') for s in streams if s.get('codec_type') == 'audio'), None)
+    video = any(s.get('codec_type') == 'video' for s in streams)
+    return audio, video
+
+
+def _ffmpeg(args, output):
+    cmd = ["ffmpeg", "-y", *args, output, "-hide_banner", "-loglevel", "error"]
+    try:
+        subprocess.run(cmd, check=True)
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ ffmpeg failed for {os.path.basename(output)}: {e}")
+        if os.path.exists(output):
+            os.remove(output)
+        return False
+
+
+def archive_audio(path, profile=DEFAULT_AUDIO_PROFILE):
+    """Turn transcription audio into its archival form; returns the path to keep.
+
+    The source is removed when a new file replaces it. On failure the source is kept as is.
+    """
+    if profile not in AUDIO_PROFILES:
+        raise ValueError(f"Unknown audio profile: {profile}")
+    codec, has_video = probe_streams(path)
+    base, ext = os.path.splitext(path)
+
+    if profile == 'original' or (profile == 'mp3' and codec == 'mp3' and not has_video):
+        if not has_video:
+            return path
+        # Only a muxed stream was available: drop the picture, keep the sound bit for bit
+        target, args = f"{base}.mka", ["-i", path, "-vn", "-map", "0:a:0", "-c:a", "copy"]
+    elif profile == 'opus' and codec == 'opus':
+        # Already Opus (YouTube's usual audio): a remux into Ogg, no decode
+        target, args = f"{base}.opus", ["-i", path, "-vn", "-map", "0:a:0", "-c:a", "copy"]
+    elif profile == 'opus':
+        target, args = f"{base}.opus", ["-i", path, "-vn", "-ac", "1", "-c:a", "libopus",
+                                        "-b:a", f"{OPUS_BITRATE}k", "-application", "voip"]
+    else:
+        target, args = f"{base}.mp3", ["-i", path, "-vn", "-c:a", "libmp3lame", "-b:a", f"{MP3_BITRATE}k"]
+
+    if target == path:
+        return path
+    if not _ffmpeg(args, target):
+        return path
+    os.remove(path)
+    return target
+
+
+def mp3_baseline_bytes(duration):
+    """Size the same audio would take as the former 192 kbps MP3."""
+    return int((duration or 0) * MP3_BITRATE * 1000 / 8)
@@ -0,0 +1,139 @@
+"""
+Confidence-driven model cascade.
+
+``--model cascade`` (or ``draft:final``, e.g. ``tiny:large``) transcribes every
+part with the fast draft model and sends only its weak segments to the large
+one: those whose average log-probability is low or whose compression ratio
+is high (repetition loops). Weak segments close to each other are merged
+into spans with a little context, all spans of a part go to the large
+model in one ``clip_timestamps`` call, and its segments replace the draft's.
+The large model is loaded only once something needs it.
+"""
+
+import whisper
+
+CASCADE = 'cascade'
+DEFAULT_CASCADE = ('base', 'medium')
+
+# Stricter than Whisper's own fallback thresholds (-1.0 / 2.4): also catch windows it accepted but barely
+LOGPROB_THRESHOLD = -0.7
+COMPRESSION_THRESHOLD = 2.2
+# Draft segments Whisper already judged silent are not worth escalating
+NO_SPEECH_THRESHOLD = 0.6
+# Context around each weak segment, and gap below which neighbouring spans are merged (seconds)
+SPAN_PADDING = 0.5
+SPAN_MERGE_GAP = 2.0
+# Planning estimate of the share of audio that gets escalated
+EXPECTED_ESCALATION = 0.15
+
+
+def parse_cascade(name):
+    """``(draft, final)`` for a cascade model name, ``None`` for a plain Whisper model."""
+    if name == CASCADE:
+        return DEFAULT_CASCADE
+    if name and ':' in name:
+        draft, final = (part.strip() for part in name.split(':', 1))
+        if draft and final:
+            return draft, final
+    return None
+
+
+def load_model(name):
+    """A Whisper model, or a :class:`CascadeTranscriber` for cascade names."""
+    cascade = parse_cascade(name)
+    if cascade:
+        return CascadeTranscriber(*cascade)
+    return whisper.load_model(name)
+
+
+class CascadeTranscriber:
+    """Stands in for a Whisper model in ``model.transcribe(path, language=...)`` calls."""
+
+    def __init__(self, draft, final, logprob_threshold=LOGPROB_THRESHOLD,
+                 compression_threshold=COMPRESSION_THRESHOLD):
+        self.draft_name = draft
+        self.final_name = final
+        self.logprob_threshold = logprob_threshold
+        self.compression_threshold = compression_threshold
+        self.draft = whisper.load_model(draft)
+        self.final = None
+        self.segments = 0
+        self.escalated = 0
+        self.seconds = 0.0
+        self.escalated_seconds = 0.0
+
+    @property
+    def name(self):
+        return f"{self.draft_name}:{self.final_name}"
+
+    def __getattr__(self, attr):
+        # Language detection and model properties come from the draft model
+        if attr == 'draft':
+            raise AttributeError(attr)
+        return getattr(self.draft, attr)
+
+    def weak(self, segment):
+        if segment.get('no_speech_prob', 0) > NO_SPEECH_THRESHOLD and \
+                segment.get('avg_logprob', 0) < self.logprob_threshold:
+            return False
+        return (segment.get('avg_logprob', 0) < self.logprob_threshold
+                or segment.get('compression_ratio', 0) > self.compression_threshold)
+
+    def _spans(self, segments, duration):
+        spans = []
+        for segment in segments:
+            if not self.weak(segment):
+                continue
+            start = max(0.0, segment['start'] - SPAN_PADDING)
+            end = min(duration, segment['end'] + SPAN_PADDING) if duration else segment['end'] + SPAN_PADDING
+            if spans and start - spans[-1][1] < SPAN_MERGE_GAP:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        return spans
+
+    def transcribe(self, audio, language=None, **options):
+        # Decode once; both passes work on the same samples
+        samples = whisper.load_audio(audio) if isinstance(audio, str) else audio
+        duration = len(samples) / whisper.audio.SAMPLE_RATE
+        result = self.draft.transcribe(samples, language=language, **options)
+        language = language or result.get('language')
+        segments = [dict(s, model=self.draft_name) for s in result.get('segments', []) if s['text'].strip()]
+        spans = self._spans(segments, duration)
+        self.segments += len(segments)
+        self.seconds += duration
+
+        if spans:
+            if self.final is None:
+                print(f"🪜 Loading cascade model: {self.final_name}")
+                self.final = whisper.load_model(self.final_name)
+            clips = ",".join(f"{start:.2f},{end:.2f}" for start, end in spans)
+            better = self.final.transcribe(samples, language=language, clip_timestamps=clips, **options)
+            # A draft segment goes when its midpoint is inside a span; the padding alone does not drop neighbours
+            kept = [s for s in segments
+                    if not any(start <= (s['start'] + s['end']) / 2 <= end for start, end in spans)]
+            self.escalated += len(segments) - len(kept)
+            self.escalated_seconds += sum(end - start for start, end in spans)
+            segments = kept + [dict(s, model=self.final_name) for s in better.get('segments', []) if s['text'].strip()]
+            segments.sort(key=lambda s: s['start'])
+
+        return {
+            'text': "".join(s['text'] for s in segments),
+            'segments': segments,
+            'language': language,
+        }
+
+    def summary(self):
+        pct = self.escalated / self.segments * 100 if self.segments else 0.0
+        audio_pct = self.escalated_seconds / self.seconds * 100 if self.seconds else 0.0
+        return (f"🪜 Cascade {self.draft_name}→{self.final_name}: escalated {self.escalated}/{self.segments} "
+                f"segment(s) ({pct:.1f}%), {audio_pct:.1f}% of the audio")
+
+
+def cascade_rtf(name, rtf):
+    """Planning CPU real-time factor of a model name given per-model factors ``rtf``."""
+    cascade = parse_cascade(name)
+    if not cascade:
+        return rtf.get(name, 0)
+    draft, final = cascade
+    return rtf.get(draft, 0) + EXPECTED_ESCALATION * rtf.get(final, 0)
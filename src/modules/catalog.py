@@ -0,0 +1,220 @@
+"""
+Sharded output layout and artifact catalog.
+
+Outputs no longer pile up in one flat directory: every file lands in
+``<kind dir>/<platform>/<YYYY-MM-DD>/<first two ID characters>/``, which keeps
+each directory small however many files are kept. Audio and transcripts
+derived from a video mirror its relative directory.
+
+Every artifact is indexed in ``output/catalog.db`` (SQLite) with its source
+URL, platform, media ID, paths, size, duration, Whisper model and timings.
+Listings and lookups query the catalog instead of walking the directories.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_CATALOG = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output', 'catalog.db'))
+
+VIDEO = 'video'
+AUDIO = 'audio'
+TRANSCRIPT = 'transcript'
+
+_COLUMNS = ('kind', 'path', 'object_path', 'source_url', 'platform', 'media_id', 'title', 'size', 'duration',
+            'model', 'download_seconds', 'transcribe_seconds', 'created')
+
+
+def shard_dir(base_dir, platform, day=None):
+    """yt-dlp output directory for a download: the ID prefix is filled in by yt-dlp."""
+    day = day or datetime.now().strftime('%Y-%m-%d')
+    # '%(id).2s' is expanded by yt-dlp once the media ID is known
+    return os.path.join(base_dir, platform, day, '%(id).2s')
+
+
+def mirror_path(path, src_root, dst_root, ext):
+    """Path under ``dst_root`` at the same relative directory as ``path`` under ``src_root``."""
+    rel = os.path.relpath(os.path.dirname(os.path.abspath(path)), src_root)
+    if rel.startswith(os.pardir):
+        rel = ''
+    directory = os.path.join(dst_root, rel)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + ext)
+
+
+class ThreadLocalConnection:
+    """One autocommit SQLite connection per thread to the database at ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def get(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute("PRAGMA journal_mode=DELETE")
+            self._local.db = db
+        return db
+
+    def close(self):
+        """Close the calling thread's connection."""
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class Artifact:
+    __slots__ = _COLUMNS
+
+    def __init__(self, row):
+        for name, value in zip(_COLUMNS, row):
+            setattr(self, name, value)
+
+
+class Catalog:
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = ThreadLocalConnection(self.path)
+        db = self._connect()
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                path TEXT UNIQUE NOT NULL,
+                object_path TEXT,
+                source_url TEXT,
+                platform TEXT,
+                media_id TEXT,
+                title TEXT,
+                size INTEGER,
+                duration REAL,
+                model TEXT,
+                download_seconds REAL,
+                transcribe_seconds REAL,
+                created REAL NOT NULL,
+                accessed REAL
+            )""")
+        columns = {row[1] for row in db.execute("PRAGMA table_info(artifacts)")}
+        if 'accessed' not in columns:
+            # Catalogs created before quota tracking
+            db.execute("ALTER TABLE artifacts ADD COLUMN accessed REAL")
+        db.execute("CREATE INDEX IF NOT EXISTS artifacts_media ON artifacts (platform, media_id)")
+        db.execute("CREATE INDEX IF NOT EXISTS artifacts_url ON artifacts (source_url)")
+        db.execute("CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (kind, created)")
+        db.execute("CREATE INDEX IF NOT EXISTS artifacts_lru ON artifacts (kind, accessed)")
+        db.execute("CREATE INDEX IF NOT EXISTS artifacts_object ON artifacts (object_path)")
+
+    def _connect(self):
+        # One connection per thread, autocommit: every record is a single statement
+        return self._db.get()
+
+    def record(self, kind, path, **fields):
+        """Index (or re-index) one artifact; unknown fields are ignored."""
+        path = os.path.abspath(path)
+        values = {name: fields.get(name) for name in _COLUMNS}
+        values.update(kind=kind, path=path, created=fields.get('created') or time.time())
+        if values['size'] is None and os.path.exists(path):
+            values['size'] = os.path.getsize(path)
+        self._connect().execute(
+            f"INSERT OR REPLACE INTO artifacts ({', '.join(_COLUMNS)}, accessed) "
+            f"VALUES ({', '.join('?' * len(_COLUMNS))}, ?)",
+            [values[name] for name in _COLUMNS] + [values['created']])
+
+    def touch(self, paths):
+        """Mark artifacts as used now, moving them to the back of the eviction order."""
+        now = time.time()
+        self._connect().executemany("UPDATE artifacts SET accessed = ? WHERE path = ?",
+                                    [(now, os.path.abspath(path)) for path in paths])
+
+    def usage(self):
+        """Bytes on disk for all artifacts; hardlinked names of one stored object count once."""
+        row = self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM artifacts "
+            "GROUP BY COALESCE(object_path, path))").fetchone()
+        return row[0]
+
+    def oldest_first(self, kinds=None, used_before=None):
+        """Artifacts of ``kinds`` (all when ``None``) by last use, optionally only those unused since ``used_before``."""
+        clauses, params = [], []
+        if kinds:
+            clauses.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if used_before is not None:
+            clauses.append("COALESCE(accessed, created) < ?")
+            params.append(used_before)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM artifacts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY COALESCE(accessed, created)"
+        return [Artifact(row) for row in self._connect().execute(sql, params)]
+
+    @contextmanager
+    def transaction(self):
+        """Group many updates into one commit (one fsync instead of one per statement)."""
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def least_recent(self, kind, limit=100, created_before=None):
+        """Oldest-used artifacts of ``kind``: the eviction candidates, optionally only those created before a time."""
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM artifacts WHERE kind = ?"
+        params = [kind]
+        if created_before is not None:
+            sql += " AND created < ?"
+            params.append(created_before)
+        sql += " ORDER BY COALESCE(accessed, created) LIMIT ?"
+        params.append(limit)
+        return [Artifact(row) for row in self._connect().execute(sql, params)]
+
+    def references(self, object_path):
+        """Catalogued names still pointing at a content-store object."""
+        return self._connect().execute("SELECT COUNT(*) FROM artifacts WHERE object_path = ?",
+                                       (object_path,)).fetchone()[0]
+
+    def forget(self, path):
+        self._connect().execute("DELETE FROM artifacts WHERE path = ?", (os.path.abspath(path),))
+
+    def find(self, kind=None, platform=None, media_id=None, source_url=None, limit=None):
+        """Artifacts matching all given fields, newest first."""
+        clauses, params = [], []
+        for name, value in (('kind', kind), ('platform', platform), ('media_id', media_id),
+                            ('source_url', source_url)):
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM artifacts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [Artifact(row) for row in self._connect().execute(sql, params)]
+
+    def totals(self):
+        """``{kind: (count, bytes)}`` over the whole catalog."""
+        rows = self._connect().execute("SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM artifacts GROUP BY kind")
+        return {kind: (count, size) for kind, count, size in rows}
+
+    def close(self):
+        self._db.close()
+
+
+def print_artifacts(artifacts):
+    from .format_policy import human_bytes
+    for a in artifacts:
+        when = datetime.fromtimestamp(a.created).strftime('%Y-%m-%d %H:%M')
+        extra = f" [{a.model}]" if a.model else ""
+        print(f"{when}  {a.kind:<10} {human_bytes(a.size or 0):>10}  {a.platform or '-'}:{a.media_id or '-'}"
+              f"{extra}  {a.path}")
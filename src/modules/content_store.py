@@ -0,0 +1,127 @@
+"""
+Content-addressed output store.
+
+Downloaded files are hashed while they are being written: the progress hook
+feeds each newly appended block of the ``.part`` file into SHA-256 while it
+is still in the page cache, so no second pass over the finished file is
+needed. The file is then stored once under ``output/store/ab/cd/<sha256>.<ext>``
+and the human-readable name in ``output/video`` or ``output/audio`` becomes
+a hardlink to it. Downloading the same media again only adds another name.
+
+Outputs that a postprocessor rewrote (merged formats, audio conversion) were
+never streamed through the hook and are hashed once after the fact.
+"""
+
+import errno
+import hashlib
+import os
+import threading
+
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output', 'store'))
+
+_CHUNK = 1 << 20
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StreamHasher:
+    """Hashes files as yt-dlp appends to them, driven by progress hook events."""
+
+    def __init__(self):
+        # Final path -> [sha256, bytes hashed]. 'finished' events carry only the final
+        # filename, never the .part tmpfilename the bytes were written to
+        self._files = {}
+        self.digests = {}  # finished path -> hex digest
+
+    def _catch_up(self, path, state):
+        try:
+            with open(path, 'rb') as f:
+                f.seek(state[1])
+                for chunk in iter(lambda: f.read(_CHUNK), b''):
+                    state[0].update(chunk)
+                    state[1] += len(chunk)
+        except OSError:
+            pass
+
+    def update(self, d):
+        if d['status'] == 'downloading':
+            final = d.get('filename')
+            path = d.get('tmpfilename') or final
+            if not path:
+                return
+            state = self._files.get(final)
+            size = d.get('downloaded_bytes') or 0
+            if state is None or size < state[1]:
+                # New file, or the download restarted from scratch
+                state = self._files[final] = [hashlib.sha256(), 0]
+            self._catch_up(path, state)
+        elif d['status'] == 'finished':
+            final = d.get('filename')
+            state = self._files.pop(final, None)
+            if final and state is not None:
+                # Renamed from .part; pick up whatever arrived after the last progress event
+                self._catch_up(final, state)
+                self.digests[os.path.abspath(final)] = state[0].hexdigest()
+
+    def digest(self, path):
+        return self.digests.get(os.path.abspath(path))
+
+
+class ContentStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.deduplicated = 0
+        self.saved_bytes = 0
+        self._links_supported = True
+
+    def object_path(self, digest, ext=''):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + ext)
+
+    def add(self, path, digest=None):
+        """Store ``path`` by content and turn ``path`` into a hardlink to the stored object.
+
+        Returns the object path, or ``path`` itself when hardlinks are not available.
+        """
+        digest = digest or hash_file(path)
+        obj = self.object_path(digest, os.path.splitext(path)[1].lower())
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        try:
+            os.link(path, obj)
+            with self._lock:
+                self.stored += 1
+            return obj
+        except FileExistsError:
+            pass
+        except OSError as e:
+            if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                if self._links_supported:
+                    print(f"⚠️ Hardlinks unavailable for {self.root} ({e.strerror}); keeping plain files")
+                    self._links_supported = False
+                return path
+            raise
+        if os.path.samefile(path, obj):
+            return obj
+        # Same content already stored (possibly by another worker at this very moment):
+        # replace our copy with a link to the existing object
+        size = os.path.getsize(path)
+        tmp = f"{path}.link"
+        os.link(obj, tmp)
+        os.replace(tmp, path)
+        with self._lock:
+            self.deduplicated += 1
+            self.saved_bytes += size
+        print(f"♻️ Identical content already stored, linked {os.path.basename(path)} -> {digest[:12]}")
+        return obj
+
+    def summary(self):
+        from .format_policy import human_bytes
+        return (f"🗄️ Content store: {self.stored} new object(s), {self.deduplicated} duplicate(s) linked, "
+                f"{human_bytes(self.saved_bytes)} saved")
@@ -0,0 +1,80 @@
+"""
+Pool of long-lived platform downloaders.
+
+Creating a downloader runs ``os.makedirs`` for every output directory and
+each one owns YoutubeDL contexts with initialized extractors, cookies and
+keep-alive connections. The pool hands out one downloader per worker at a
+time (``with pool.lease(platform) as downloader:``) and keeps it for the
+next job instead of rebuilding it per URL.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from .video_downloader_extended import create_downloader
+
+
+class DownloaderPool:
+    def __init__(self, factory=None, **options):
+        # Every downloader built by the pool shares the given BaseDownloader options: the
+        # session manager's cookie jars, the download archive, the content store, the
+        # catalog, the transcript index and the disk quota
+        self._factory = factory or partial(create_downloader, **options)
+        # Shared resources the pool closes along with its downloaders
+        self.catalog = options.get('catalog')
+        self.index = options.get('index')
+        self.quota = options.get('quota')
+        self.sessions = options.get('sessions')
+        self._idle = {}
+        self._all = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.leases = 0
+
+    def _acquire(self, platform):
+        with self._lock:
+            self.leases += 1
+            idle = self._idle.get(platform)
+            if idle:
+                return idle.pop()
+        # Build outside the lock; a new instance is only needed when every
+        # pooled downloader for this platform is busy in another worker
+        downloader = self._factory(platform)
+        with self._lock:
+            self.created += 1
+            self._all.append(downloader)
+        return downloader
+
+    def _release(self, platform, downloader):
+        with self._lock:
+            self._idle.setdefault(platform, []).append(downloader)
+
+    @contextmanager
+    def lease(self, platform):
+        """Borrow a downloader for ``platform`` exclusively for the duration of the block."""
+        downloader = self._acquire(platform)
+        try:
+            yield downloader
+        finally:
+            self._release(platform, downloader)
+
+    def close(self):
+        with self._lock:
+            downloaders, self._all, self._idle = self._all, [], {}
+        for downloader in downloaders:
+            downloader.close()
+        if self.sessions is not None:
+            self.sessions.save()
+        if self.quota is not None:
+            self.quota.close()
+        if self.catalog is not None:
+            self.catalog.close()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,202 @@
+"""
+Lazy playlist, channel and profile expansion.
+
+Collection URLs are enumerated flat (``extract_flat``), one page at a time,
+and each entry is handed on as soon as its page arrives, so the first
+videos start downloading while later pages are still being fetched.
+Entries already recorded in the download archive are skipped without any
+per-video request.
+"""
+
+import itertools
+import os
+import threading
+
+import yt_dlp
+from yt_dlp.utils import locked_file, make_archive_id
+
+# Listings ordered newest first, where sync can stop at the last known video
+SYNC_KINDS = ('channel', 'profile')
+
+DEFAULT_ARCHIVE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output', 'download_archive.txt'))
+
+
+class DownloadArchive:
+    """yt-dlp download archive loaded once and shared by every YoutubeDL context.
+
+    Each context normally keeps its own copy of the archive in memory, so an entry
+    recorded by one worker would stay invisible to the others until restart. yt-dlp
+    only reads it: a video is recorded once its whole job (download and transcript)
+    has succeeded, so a failed transcription is retried on the next run.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE):
+        self.path = os.path.abspath(path)
+        self._lock = threading.Lock()
+        self.ids = set()
+        if os.path.isfile(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.ids.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, archive_id):
+        return archive_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def attach(self, ydl):
+        # yt-dlp checks the shared set before any transfer
+        ydl.archive = self.ids
+
+    def record(self, info):
+        """Add a finished video (a processed info dict) to the archive."""
+        extractor = info.get('extractor_key') or info.get('ie_key')
+        if not extractor or not info.get('id'):
+            return
+        archive_id = make_archive_id(extractor, info['id'])
+        with self._lock:
+            if archive_id in self.ids:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Locked like yt-dlp's own writes: other hosts may share the file
+            with locked_file(self.path, 'a', encoding='utf-8') as f:
+                f.write(archive_id + '\n')
+            self.ids.add(archive_id)
+
+
+class ExpansionStats:
+    def __init__(self):
+        self.collections = 0
+        self.entries = 0
+        self.archived = 0
+
+
+class PlaylistExpander:
+    def __init__(self, sessions=None, archive=None, limit=None, page_size=50, max_depth=2, sync=None):
+        self.sessions = sessions
+        self.archive = archive
+        self.sync = sync  # SyncState: stop channels/profiles at their high-water mark
+        self.limit = limit  # new entries per collection; archived entries do not count
+        self.page_size = page_size
+        self.max_depth = max_depth
+        self.stats = ExpansionStats()
+        self._contexts = {}
+
+    def _ydl(self, platform):
+        ydl = self._contexts.get(platform)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': 'in_playlist',
+                'lazy_playlist': True,
+                'skip_download': True,
+            })
+            if self.sessions is not None:
+                self.sessions.attach(ydl, platform)
+            self._contexts[platform] = ydl
+        return ydl
+
+    def _pages(self, entries):
+        """Iterate entries of any yt-dlp container, fetching pages only when reached."""
+        if hasattr(entries, 'getslice'):
+            start = 0
+            while True:
+                page = entries.getslice(start, start + self.page_size)
+                yield from page
+                if len(page) < self.page_size:
+                    return
+                start += self.page_size
+        else:
+            yield from entries or ()
+
+    def _entries(self, ydl, url, ie_key=None, depth=0, listing=None):
+        """Yield ``(run, entry)`` for every video under ``url``.
+
+        ``listing(source, entries)`` wraps the entries of each playlist on its own, so a
+        sync can stop one channel tab at its mark and still go on to the next tab.
+        """
+        result = ydl.extract_info(url, download=False, process=False, ie_key=ie_key)
+        # Channel home pages and short links resolve to the real playlist first
+        while result.get('_type') in ('url', 'url_transparent') and depth < self.max_depth:
+            depth += 1
+            result = ydl.extract_info(result['url'], download=False, process=False, ie_key=result.get('ie_key'))
+        if result.get('_type') != 'playlist':
+            yield None, result
+            return
+        yield from self._playlist(ydl, result, url, depth, listing)
+
+    def _playlist(self, ydl, playlist, source, depth, listing):
+        tabs = []
+
+        def own():
+            for entry in self._pages(playlist.get('entries')):
+                if not entry:
+                    continue
+                nested = entry.get('_type') == 'playlist' or (
+                    entry.get('_type') == 'url' and str(entry.get('ie_key', '')).endswith('Tab'))
+                if nested and depth < self.max_depth:
+                    # Channel tabs (videos, shorts, streams) are playlists of their own, listed after
+                    # this one's videos (a channel home page holds nothing but its tabs)
+                    tabs.append(entry)
+                else:
+                    yield entry
+
+        if listing is None:
+            yield from ((None, entry) for entry in own())
+        else:
+            yield from listing(source, own())
+        for tab in tabs:
+            if tab.get('_type') == 'playlist':
+                yield from self._playlist(ydl, tab, tab.get('webpage_url') or tab.get('url') or source,
+                                          depth + 1, listing)
+            else:
+                yield from self._entries(ydl, tab['url'], tab.get('ie_key'), depth + 1, listing)
+
+    def _sync_listing(self, source, entries):
+        """Stop each listing at its own high-water mark; listings without videos start no run."""
+        entries = iter(entries)
+        first = next(entries, None)
+        if first is None:
+            return
+        run = self.sync.begin(source)
+        for entry in self.sync.entries(run, itertools.chain([first], entries)):
+            yield run, entry
+
+    def expand(self, routed):
+        """Yield the video URLs of a playlist/channel/profile, lazily, skipping archived entries."""
+        print(f"📚 Expanding {routed.kind}: {routed.url}")
+        self.stats.collections += 1
+        ydl = self._ydl(routed.platform)
+        count = 0
+        # Only newest-first listings can stop at a mark; playlists rely on the archive
+        listing = self._sync_listing if self.sync is not None and routed.kind in SYNC_KINDS else None
+        try:
+            for run, entry in self._entries(ydl, routed.url, listing=listing):
+                url = entry.get('url') or entry.get('webpage_url')
+                if not url:
+                    continue
+                extractor = entry.get('ie_key') or entry.get('extractor_key')
+                if self.archive is not None and extractor and entry.get('id') \
+                        and make_archive_id(extractor, entry['id']) in self.archive:
+                    self.stats.archived += 1
+                    if run is not None:
+                        self.sync.skip(run, entry['id'])
+                    continue
+                self.stats.entries += 1
+                count += 1
+                yield url
+                if self.limit and count >= self.limit:
+                    print(f"ℹ️ Reached the limit of {self.limit} new entries for {routed.url}")
+                    return
+        except Exception as e:
+            print(f"❌ Failed to expand {routed.url}: {e}")
+
+    def summary(self):
+        return (f"📚 Expanded {self.stats.collections} collection(s) into {self.stats.entries} new video(s), "
+                f"{self.stats.archived} already in the archive")
+
+    def close(self):
+        for ydl in self._contexts.values():
+            ydl.close()
+        self._contexts.clear()
@@ -0,0 +1,205 @@
+"""
+Format selection policies for yt-dlp downloads.
+
+A policy caps what a download is allowed to pull (height, bitrate) and
+states preferences that avoid extra work after the transfer (pre-muxed
+streams, codecs that merge into MP4 by stream copy). Policies are chosen
+per platform and every download can report how many bytes it saved
+compared with the default ``bestvideo+bestaudio/best`` selection. Audio
+that only feeds Whisper uses a separate minimal-bitrate selector.
+"""
+
+import threading
+
+from .time_ranges import clip_fraction
+
+DEFAULT_FORMAT = 'bestvideo+bestaudio/best'
+AUDIO_FORMAT = 'bestaudio/best'
+
+# Whisper resamples everything to 16 kHz mono, so anything above speech
+# quality is wasted transfer when the audio only feeds a transcription
+TRANSCRIBE_MIN_ABR = 32
+
+FORMAT_POLICIES = {
+    'default': {},
+    '1080p': {'max_height': 1080},
+    '720p': {'max_height': 720, 'prefer_muxed': True},
+    '480p': {'max_height': 480, 'prefer_muxed': True},
+    'datasaver': {'max_height': 360, 'max_tbr': 800, 'prefer_muxed': True},
+    'no-remux': {'max_height': 1080, 'prefer_codecs': ('avc1', 'mp4a')},
+}
+
+# Platform defaults; anything missing falls back to 'default'
+PLATFORM_POLICIES = {
+    'youtube': 'default',
+    'facebook': 'default',
+    'tiktok': 'default',
+    'x': 'default',
+}
+
+
+def _filters(policy):
+    filters = ''
+    if policy.get('max_height'):
+        filters += f"[height<=?{policy['max_height']}]"
+    if policy.get('max_tbr'):
+        filters += f"[tbr<=?{policy['max_tbr']}]"
+    return filters
+
+
+def build_format_spec(policy_name):
+    """Translate a policy name into a yt-dlp format selector string."""
+    policy = FORMAT_POLICIES.get(policy_name or 'default')
+    if policy is None:
+        raise ValueError(f"Unknown format policy: {policy_name}")
+    if not policy:
+        return DEFAULT_FORMAT
+
+    f = _filters(policy)
+    candidates = []
+    if policy.get('prefer_muxed'):
+        # A single progressive stream needs no ffmpeg merge at all, but only at the capped height:
+        # YouTube's one progressive stream is 360p and would otherwise win over 720p/480p
+        floor = f"[height>={policy['max_height']}]" if policy.get('max_height') else ''
+        candidates.append(f"best[vcodec!=none][acodec!=none]{floor}{f}")
+    if policy.get('prefer_codecs'):
+        vcodec, acodec = policy['prefer_codecs']
+        candidates.append(f"bestvideo[vcodec^={vcodec}]{f}+bestaudio[acodec^={acodec}]")
+    candidates.append(f"bestvideo{f}+bestaudio")
+    candidates.append(f"best{f}")
+    # Nothing satisfies the caps: take the smallest stream instead of the largest
+    candidates.append('worst')
+    return '/'.join(candidates)
+
+
+def _bitrate(fmt):
+    return fmt.get('abr') or fmt.get('tbr') or 0
+
+
+def _smallest(fmt):
+    # Unknown sizes sort last; bitrate breaks ties and orders streams without a size
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    return (size or float('inf'), _bitrate(fmt) or float('inf'))
+
+
+def build_transcribe_audio_spec(min_abr=None):
+    """yt-dlp format selector: smallest audio-only stream meeting ``min_abr`` kbps, else the smallest muxed stream.
+
+    A callable rather than a format string: ``worstaudio[abr>=N]`` follows yt-dlp's default
+    sort, which ranks codec preference above bitrate and so picks a 129k AAC stream over a
+    50k Opus one. Here the choice is by size alone.
+    """
+    min_abr = TRANSCRIBE_MIN_ABR if min_abr is None else min_abr
+
+    def select(ctx):
+        formats = ctx.get('formats') or []
+        audio = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none']
+        enough = [f for f in audio if _bitrate(f) >= min_abr]
+        if enough:
+            # Cheapest audio-only stream above the floor
+            yield min(enough, key=_smallest)
+        elif audio:
+            # Every audio-only stream is below the floor (or unlabeled): take the closest
+            yield max(audio, key=_bitrate)
+        else:
+            # No audio-only streams at all: extract audio from the smallest muxed stream
+            muxed = [f for f in formats if f.get('acodec') != 'none'] or formats
+            if muxed:
+                yield min(muxed, key=_smallest)
+
+    return select
+
+
+def resolve_policy(platform, policy=None, overrides=None):
+    """Pick the policy for a platform: explicit override > global choice > platform default."""
+    if overrides and platform in overrides:
+        return overrides[platform]
+    if policy:
+        return policy
+    return PLATFORM_POLICIES.get(platform, 'default')
+
+
+def parse_platform_policies(values):
+    """Parse ``platform=policy`` pairs from the command line."""
+    overrides = {}
+    for value in values or []:
+        platform, sep, name = value.partition('=')
+        if not sep or not platform or name not in FORMAT_POLICIES:
+            raise ValueError(f"Invalid platform policy: {value}")
+        overrides[platform.strip().lower()] = name
+    return overrides
+
+
+def format_size(fmt, duration=None):
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if not size and fmt.get('tbr') and duration:
+        size = fmt['tbr'] * 1000 / 8 * duration
+    return int(size or 0)
+
+
+def selected_formats(info):
+    """Formats yt-dlp picked for a processed info dict."""
+    return info.get('requested_formats') or [info]
+
+
+def estimate_transfer_bytes(info, ranges=None):
+    """Bytes the already selected formats of ``info`` will pull, scaled to the requested clips."""
+    duration = info.get('duration')
+    selected = sum(format_size(f, duration) for f in selected_formats(info))
+    return int(selected * clip_fraction(ranges, duration))
+
+
+def estimate_selection_bytes(ydl, info, format_spec):
+    """Size of what ``format_spec`` would download for an already extracted ``info``."""
+    formats = info.get('formats') or []
+    if not formats:
+        return 0
+    selector = ydl.build_format_selector(format_spec)
+    chosen = list(selector({
+        'formats': formats,
+        'has_merged_format': any('none' not in (f.get('acodec'), f.get('vcodec')) for f in formats),
+        'incomplete_formats': (all(f.get('vcodec') == 'none' for f in formats)
+                               or all(f.get('acodec') == 'none' for f in formats)),
+    }))
+    total = 0
+    for fmt in chosen:
+        for part in fmt.get('requested_formats') or [fmt]:
+            total += format_size(part, info.get('duration'))
+    return total
+
+
+def human_bytes(num):
+    for unit in ('B', 'KiB', 'MiB', 'GiB', 'TiB'):
+        if abs(num) < 1024 or unit == 'TiB':
+            return f"{num:.1f} {unit}" if unit != 'B' else f"{int(num)} B"
+        num /= 1024
+
+
+class TransferReport:
+    """Accumulates bytes selected vs. bytes the baseline selection would have pulled."""
+
+    def __init__(self, label='Format policy', action='transferred'):
+        self.label = label
+        self.action = action
+        self._lock = threading.Lock()
+        self.downloads = 0
+        self.selected_bytes = 0
+        self.baseline_bytes = 0
+
+    def record(self, selected, baseline):
+        with self._lock:
+            self.downloads += 1
+            self.selected_bytes += selected
+            self.baseline_bytes += baseline
+
+    @property
+    def saved_bytes(self):
+        return self.baseline_bytes - self.selected_bytes
+
+    def summary(self):
+        if not self.downloads:
+            return f"📉 {self.label}: no downloads measured"
+        pct = (self.saved_bytes / self.baseline_bytes * 100) if self.baseline_bytes else 0.0
+        return (f"📉 {self.label}: {human_bytes(self.selected_bytes)} {self.action} vs "
+                f"{human_bytes(self.baseline_bytes)} baseline, saved {human_bytes(self.saved_bytes)} "
+                f"({pct:.1f}%) across {self.downloads} download(s)")
@@ -0,0 +1,180 @@
+"""
+Streaming URL ingestion.
+
+URL lists are read lazily, line by line, from a file or ``-`` (stdin) and
+deduplicated in flight, so processing starts with the first line and memory
+stays flat however long the list is. Media keys seen so far are kept in an
+exact set up to a limit; past it they move into a Bloom filter, which may
+skip a very small fraction of unique URLs as false positives but never lets
+a duplicate through.
+"""
+
+import hashlib
+import math
+import sys
+from itertools import islice
+
+from .scheduler import Job, parse_job_line
+from .url_router import COLLECTION_KINDS, dedupe, download_url
+
+STDIN = '-'
+
+
+def open_source(path):
+    """Open a URL list for streaming; ``-`` reads from stdin."""
+    if path == STDIN:
+        return sys.stdin
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_lines(source):
+    """Yield non-empty, non-comment lines from an open file without reading it all."""
+    for line in source:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def count_lines(path, chunk_size=1 << 20):
+    """Count lines of a file in constant memory (used for progress totals)."""
+    count = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            count += chunk.count(b'\n')
+    return count
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Kirsch-Mitzenmacher double hashing over one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenSet:
+    """Set of media keys with bounded memory: exact up to ``exact_limit`` keys, then a Bloom filter."""
+
+    def __init__(self, exact_limit=1_000_000, capacity=20_000_000, error_rate=0.001):
+        self.exact_limit = exact_limit
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._exact = set()
+        self._bloom = None
+        self.count = 0
+
+    @staticmethod
+    def _key(key):
+        return '\0'.join(key) if isinstance(key, tuple) else key
+
+    @property
+    def approximate(self):
+        return self._bloom is not None
+
+    def __contains__(self, key):
+        key = self._key(key)
+        if self._bloom is not None:
+            return key in self._bloom
+        return key in self._exact
+
+    def add(self, key):
+        key = self._key(key)
+        self.count += 1
+        if self._bloom is not None:
+            self._bloom.add(key)
+            return
+        self._exact.add(key)
+        if len(self._exact) > self.exact_limit:
+            print(f"ℹ️ More than {self.exact_limit:,} unique URLs: switching deduplication to a Bloom filter "
+                  f"(~{self.error_rate:.2%} false positives up to {self.capacity:,} keys)")
+            self._bloom = BloomFilter(max(self.capacity, self.exact_limit * 2), self.error_rate)
+            for exact in self._exact:
+                self._bloom.add(exact)
+            self._exact = set()
+
+
+class IngestStats:
+    def __init__(self):
+        self.lines = 0
+        self.invalid = 0
+        self.urls = 0  # URLs offered to dedup: valid lines plus expanded entries
+        self.collections = 0
+        self.jobs = 0
+        self.expanded = 0  # jobs that came from a playlist/channel/profile
+
+    @property
+    def duplicates(self):
+        return self.urls - self.collections - self.jobs
+
+
+def stream_jobs(lines, seen=None, stats=None, expand=None, resolve=None, dropped=None):
+    """Turn batch lines into deduplicated :class:`Job` objects, lazily and in input order.
+
+    Lines may carry ``deadline=``/``weight=`` tokens (see ``parse_job_line``); invalid
+    lines are reported and skipped so one bad line does not stop a long stream.
+    With ``expand``, playlist/channel/profile URLs are replaced by the video URLs
+    ``expand(routed)`` yields, which inherit the tokens of their line. With
+    ``resolve``, short links are resolved before deduplication (see ``dedupe``).
+    ``dropped(url)`` hears about expanded entries skipped as duplicates.
+    """
+    seen = SeenSet() if seen is None else seen
+    stats = stats or IngestStats()
+    attrs_by_url = {}
+
+    def urls():
+        for line in lines:
+            stats.lines += 1
+            try:
+                url, attrs = parse_job_line(line)
+            except ValueError as e:
+                stats.invalid += 1
+                print(f"❌ Skipping invalid line {stats.lines}: {e}")
+                continue
+            # Only the line currently being routed is remembered
+            attrs_by_url.clear()
+            attrs_by_url[url] = attrs
+            stats.urls += 1
+            yield url
+
+    def entries(routed):
+        stats.collections += 1
+        for url in expand(routed):
+            stats.urls += 1
+            yield url
+
+    def job(url, routed, attrs):
+        stats.jobs += 1
+        return Job(download_url(routed) if routed else url, index=stats.jobs - 1,
+                   platform=routed.platform if routed else None, **attrs)
+
+    for url, routed in dedupe(urls(), seen, resolve):
+        attrs = attrs_by_url.get(url, {})
+        if expand is not None and routed is not None and routed.kind in COLLECTION_KINDS:
+            for entry_url, entry_routed in dedupe(entries(routed), seen, dropped=dropped):
+                stats.expanded += 1
+                yield job(entry_url, entry_routed, attrs)
+            continue
+        yield job(url, routed, attrs)
+
+
+def windows(iterable, size):
+    """Yield lists of up to ``size`` items, reading ``iterable`` only as far as needed."""
+    iterator = iter(iterable)
+    while True:
+        window = list(islice(iterator, size))
+        if not window:
+            return
+        yield window
@@ -0,0 +1,334 @@
+"""
+Shared job store for multi-host worker mode.
+
+``enqueue`` fills the store with deduplicated jobs; any number of
+``worker`` processes on any number of hosts then lease jobs one at a time.
+A lease expires unless its holder heartbeats, so jobs held by a crashed or
+partitioned worker return to the queue after ``lease_seconds``. Failed jobs
+are retried until ``max_attempts``.
+
+Two backends:
+
+* SQLite - a file path (``jobs.db`` or ``sqlite:///path/jobs.db``); may sit
+  on NFS for small clusters since it uses the rollback journal, not WAL
+* Redis - ``redis://host:6379/0``; needs the ``redis`` package
+
+``--shard i/N`` is the coordinator-free alternative: every host reads the
+same list and keeps the jobs whose canonical ID hashes to its shard.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+from .catalog import ThreadLocalConnection
+from .media_record import MediaRecord
+from .scheduler import Job
+from .url_router import route
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_LEASE = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def job_key(url):
+    """Canonical ID of a job: the router's media key, or the URL itself for unsupported URLs."""
+    routed = route(url)
+    return ':'.join(routed.key) if routed else url
+
+
+def parse_shard(value):
+    """Parse ``i/N`` (0 <= i < N) into ``(i, N)``."""
+    index, sep, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not sep or count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard: {value} (expected i/N with 0 <= i < N)")
+    return index, count
+
+
+def shard_of(key, count):
+    # Stable across hosts and runs, unlike the salted built-in hash()
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def in_shard(job, shard):
+    index, count = shard
+    return shard_of(job_key(job.url), count) == index
+
+
+def _job_payload(job):
+    return json.dumps({
+        'platform': job.platform,
+        'weight': job.weight,
+        'deadline': job.deadline,
+        'record': job.info.to_dict() if isinstance(job.info, MediaRecord) else None,
+    })
+
+
+def _job_from_payload(key, url, payload, index=0):
+    data = json.loads(payload)
+    record = MediaRecord.from_dict(data['record']) if data.get('record') else None
+    return Job(url, index=index, info=record, platform=data.get('platform'),
+               duration=record.duration if record else None, size=record.size if record else 0,
+               weight=data.get('weight'), deadline=data.get('deadline'), key=key)
+
+
+class SQLiteJobStore:
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = os.path.abspath(path)
+        self.max_attempts = max_attempts
+        self._db = ThreadLocalConnection(self.path)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT UNIQUE NOT NULL,
+                    url TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated REAL
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)")
+
+    def _connect(self):
+        # One connection per thread; IMMEDIATE transactions serialize lease grabs across hosts
+        return _Transaction(self._db.get())
+
+    def enqueue(self, jobs):
+        """Add jobs, ignoring canonical IDs already in the store; returns how many were new."""
+        added = 0
+        with self._connect() as db:
+            for job in jobs:
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO jobs (key, url, payload, updated) VALUES (?, ?, ?, ?)",
+                    (job_key(job.url), job.url, _job_payload(job), time.time()))
+                added += cursor.rowcount
+        return added
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE):
+        """Take the oldest queued job, or one whose lease expired; ``None`` when nothing is available."""
+        now = time.time()
+        with self._connect() as db:
+            while True:
+                row = db.execute(
+                    "SELECT id, key, url, payload, status, worker, attempts FROM jobs "
+                    "WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY id LIMIT 1",
+                    (QUEUED, LEASED, now)).fetchone()
+                if row is None:
+                    return None
+                job_id, key, url, payload, status, previous, attempts = row
+                if status != LEASED:
+                    break
+                if attempts < self.max_attempts:
+                    print(f"⏰ Lease of {previous} on {url} expired, reassigning")
+                    break
+                # A job that keeps crashing or hanging its workers never reaches complete()
+                print(f"⏰ Lease of {previous} on {url} expired after {attempts} attempt(s), giving up")
+                db.execute("UPDATE jobs SET status = ?, lease_until = NULL, error = ?, updated = ? WHERE id = ?",
+                           (FAILED, "lease expired", now, job_id))
+            db.execute("UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, "
+                       "updated = ? WHERE id = ?", (LEASED, worker, now + lease_seconds, now, job_id))
+        return _job_from_payload(key, url, payload, index=job_id)
+
+    def heartbeat(self, key, worker, lease_seconds=DEFAULT_LEASE):
+        """Extend a lease; ``False`` if the worker lost it (expired and taken by someone else)."""
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute("UPDATE jobs SET lease_until = ?, updated = ? "
+                                "WHERE key = ? AND worker = ? AND status = ?",
+                                (now + lease_seconds, now, key, worker, LEASED))
+            return cursor.rowcount == 1
+
+    def complete(self, key, worker, ok=True, error=None):
+        with self._connect() as db:
+            if ok:
+                status = DONE
+            else:
+                attempts = db.execute("SELECT attempts FROM jobs WHERE key = ?", (key,)).fetchone()
+                status = FAILED if attempts and attempts[0] >= self.max_attempts else QUEUED
+            db.execute("UPDATE jobs SET status = ?, lease_until = NULL, error = ?, updated = ? "
+                       "WHERE key = ? AND worker = ?", (status, error, time.time(), key, worker))
+
+    def counts(self):
+        with self._connect() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self._db.close()
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_REDIS_LEASE = """
+local key = redis.call('LPOP', KEYS[1])
+if not key then return nil end
+redis.call('ZADD', KEYS[2], ARGV[1], key)
+redis.call('HSET', ARGV[3] .. key, 'status', 'leased', 'worker', ARGV[2])
+redis.call('HINCRBY', ARGV[3] .. key, 'attempts', 1)
+return key
+"""
+
+# Finish only while this worker still holds the lease: once it expired and was
+# reclaimed, a late complete() must not overwrite the job or queue it twice
+_REDIS_COMPLETE = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then return 0 end
+if redis.call('HGET', KEYS[2], 'worker') ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[1])
+local status = 'done'
+if ARGV[3] == '0' then
+  status = 'queued'
+  if tonumber(redis.call('HGET', KEYS[2], 'attempts') or '0') >= tonumber(ARGV[4]) then status = 'failed' end
+end
+redis.call('HSET', KEYS[2], 'status', status, 'error', ARGV[5])
+if status == 'queued' then
+  redis.call('HDEL', KEYS[2], 'worker')
+  redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisJobStore:
+    """Same contract on Redis: a FIFO list of keys, a hash per job and a sorted set of lease expiries."""
+
+    def __init__(self, url, max_attempts=DEFAULT_MAX_ATTEMPTS, prefix='sdt:jobs'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for redis:// job stores (pip install redis)") from None
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+        self._lease_script = self.redis.register_script(_REDIS_LEASE)
+        self._complete_script = self.redis.register_script(_REDIS_COMPLETE)
+
+    def _name(self, suffix):
+        return f"{self.prefix}:{suffix}"
+
+    def enqueue(self, jobs):
+        added = 0
+        for job in jobs:
+            key = job_key(job.url)
+            # HSETNX on the url field doubles as the dedup check
+            if self.redis.hsetnx(self._name(f"job:{key}"), 'url', job.url):
+                self.redis.hset(self._name(f"job:{key}"), mapping={
+                    'payload': _job_payload(job), 'status': QUEUED, 'attempts': 0})
+                self.redis.rpush(self._name('queue'), key)
+                added += 1
+        return added
+
+    def _reclaim_expired(self, now):
+        for key in self.redis.zrangebyscore(self._name('leases'), '-inf', now):
+            # Only the worker whose ZREM succeeds requeues the job
+            if self.redis.zrem(self._name('leases'), key):
+                name = self._name(f"job:{key}")
+                previous = self.redis.hget(name, 'worker')
+                attempts = int(self.redis.hget(name, 'attempts') or 0)
+                if attempts >= self.max_attempts:
+                    print(f"⏰ Lease of {previous} on {key} expired after {attempts} attempt(s), giving up")
+                    self.redis.hset(name, mapping={'status': FAILED, 'error': "lease expired"})
+                    self.redis.hdel(name, 'worker')
+                    continue
+                print(f"⏰ Lease of {previous} on {key} expired, reassigning")
+                # Drop the owner so the old worker's heartbeat and complete() no longer match
+                self.redis.hset(name, 'status', QUEUED)
+                self.redis.hdel(name, 'worker')
+                self.redis.lpush(self._name('queue'), key)
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE):
+        now = time.time()
+        self._reclaim_expired(now)
+        # Pop and lease in one script so a crash in between cannot drop the job
+        key = self._lease_script(keys=[self._name('queue'), self._name('leases')],
+                                 args=[now + lease_seconds, worker, self._name('job:')])
+        if key is None:
+            return None
+        data = self.redis.hgetall(self._name(f"job:{key}"))
+        return _job_from_payload(key, data['url'], data['payload'])
+
+    def heartbeat(self, key, worker, lease_seconds=DEFAULT_LEASE):
+        if self.redis.hget(self._name(f"job:{key}"), 'worker') != worker:
+            return False
+        # XX: never resurrect a lease that was already reclaimed
+        self.redis.zadd(self._name('leases'), {key: time.time() + lease_seconds}, xx=True)
+        return self.redis.zscore(self._name('leases'), key) is not None
+
+    def complete(self, key, worker, ok=True, error=None):
+        self._complete_script(keys=[self._name('leases'), self._name(f"job:{key}"), self._name('queue')],
+                              args=[key, worker, 1 if ok else 0, self.max_attempts, error or ''])
+
+    def counts(self):
+        counts = {}
+        for name in self.redis.scan_iter(self._name('job:*')):
+            status = self.redis.hget(name, 'status')
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def close(self):
+        self.redis.close()
+
+
+def open_job_store(url, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisJobStore(url, max_attempts=max_attempts)
+    return SQLiteJobStore(url.removeprefix('sqlite:///'), max_attempts=max_attempts)
+
+
+class Heartbeat:
+    """Keeps a lease alive from a background thread while the job runs."""
+
+    def __init__(self, store, key, worker, lease_seconds=DEFAULT_LEASE):
+        self.store = store
+        self.key = key
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.store.heartbeat(self.key, self.worker, self.lease_seconds):
+                    print(f"⚠️ Lost the lease on {self.key}; another worker may run it again")
+                    self.lost = True
+                    return
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed for {self.key}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
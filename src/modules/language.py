@@ -0,0 +1,85 @@
+"""
+Spoken language, decided once per media file.
+
+``model.transcribe`` detects the language of every audio part it is given
+from that part's first 30 seconds: one extra decoder pass per part, and a
+part opening on music or silence can flip the language mid-file. The
+language is instead taken from platform metadata when the platform
+declares it, or detected once from the first windows of the file that
+carry sound, and then passed to every part.
+"""
+
+import subprocess
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import N_SAMPLES, SAMPLE_RATE
+from whisper.tokenizer import LANGUAGES, TO_LANGUAGE_CODE
+
+# 30-second windows scanned from the start of the file
+DETECT_WINDOWS = 4
+# A window this confident decides on its own; otherwise the most confident one wins
+MIN_CONFIDENCE = 0.6
+# RMS below this is treated as silence and not worth a detection pass
+SILENCE_RMS = 0.005
+
+
+def metadata_language(value):
+    """Whisper code for a platform language tag (``en-US``, ``pt-BR``, ``English``); ``None`` if unknown."""
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    code = value.replace('_', '-').split('-')[0]
+    if code in LANGUAGES:
+        return code
+    return TO_LANGUAGE_CODE.get(value)
+
+
+def _load_head(path, start, seconds):
+    """The first ``seconds`` of audio from ``start`` as 16 kHz mono float32, without decoding the rest."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-ss", str(start), "-t", str(seconds), "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+        "-loglevel", "error",
+    ]
+    output = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(output, np.int16).astype(np.float32) / 32768.0
+
+
+def detect_language(model, path, start=0.0, windows=DETECT_WINDOWS, min_confidence=MIN_CONFIDENCE):
+    """``(code, probability)`` from the first speech-bearing windows of ``path``; ``(None, 0.0)`` if none."""
+    try:
+        audio = _load_head(path, start, windows * N_SAMPLES // SAMPLE_RATE)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Could not read audio for language detection: {e}")
+        return None, 0.0
+    chunks = [audio[i:i + N_SAMPLES] for i in range(0, len(audio), N_SAMPLES)]
+    chunks = [chunk for chunk in chunks if len(chunk) and np.sqrt(np.mean(chunk ** 2)) >= SILENCE_RMS]
+    if not chunks:
+        return None, 0.0
+    # All windows go through the encoder as one batch
+    mels = [whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), model.dims.n_mels) for chunk in chunks]
+    _, probs = model.detect_language(torch.stack(mels).to(model.device))
+    best = (None, 0.0)
+    for window in probs:
+        code = max(window, key=window.get)
+        if window[code] >= min_confidence:
+            return code, window[code]
+        if window[code] > best[1]:
+            best = (code, window[code])
+    return best
+
+
+def pin_language(model, path, metadata=None, start=0.0):
+    """Language to pass to every ``model.transcribe`` call for one file; ``None`` lets Whisper decide."""
+    if not model.is_multilingual:
+        return 'en'
+    code = metadata_language(metadata)
+    if code:
+        print(f"🌐 Language from platform metadata: {LANGUAGES[code].title()}")
+        return code
+    code, probability = detect_language(model, path, start)
+    if code:
+        print(f"🌐 Detected language: {LANGUAGES[code].title()} ({probability:.0%})")
+    return code
@@ -0,0 +1,112 @@
+"""
+Compact metadata records for queued jobs.
+
+A processed yt-dlp info dict carries every available format, thumbnail,
+subtitle track and HTTP header set; a batch that keeps one per queued URL
+spends most of its memory on data the pipeline never reads.
+``MediaRecord`` keeps only what planning, scheduling and the real
+download need: identity fields, duration, size estimates and the formats
+yt-dlp already chose. ``to_info()`` rebuilds a minimal info dict that
+``process_ie_result`` re-selects the same formats from.
+"""
+
+import json
+import time
+
+from .format_policy import estimate_transfer_bytes
+
+# Format URLs are signed and expire (YouTube: about six hours); older records are re-extracted
+FORMAT_URL_TTL = 3600
+
+# Top-level keys yt-dlp needs to resume processing a probed video
+_INFO_FIELDS = (
+    '_type', 'id', 'display_id', 'extractor', 'extractor_key', 'webpage_url', 'webpage_url_basename',
+    'webpage_url_domain', 'original_url', 'uploader', 'channel', 'upload_date', 'timestamp',
+    'live_status', 'was_live', 'http_headers', '_format_sort_fields',
+)
+
+
+def chosen_formats(info):
+    """The format dicts yt-dlp selected for a processed info dict (merged parts or the single format)."""
+    if info.get('requested_formats'):
+        return [dict(f) for f in info['requested_formats']]
+    for fmt in info.get('formats') or []:
+        if fmt.get('format_id') == info.get('format_id'):
+            return [dict(fmt)]
+    return []
+
+
+class MediaRecord:
+    __slots__ = ('url', 'platform', 'id', 'title', 'duration', 'is_live', 'language',
+                 'size', 'baseline_size', 'formats', 'fields', 'probed')
+
+    def __init__(self, url, platform=None, id=None, title=None, duration=None, is_live=False, language=None,
+                 size=0, baseline_size=None, formats=(), fields=None, probed=None):
+        self.url = url
+        self.platform = platform
+        self.id = id
+        self.title = title
+        self.duration = duration
+        self.is_live = is_live
+        self.language = language
+        self.size = size  # estimated bytes of the chosen formats, full length
+        self.baseline_size = baseline_size  # same for the default format selection, if measured
+        self.formats = tuple(formats)
+        self.fields = fields or {}
+        self.probed = probed or time.time()  # when the format URLs were extracted
+
+    @classmethod
+    def from_info(cls, info, url=None, platform=None, baseline_size=None):
+        """Compact a processed info dict (``extract_info(download=False)``)."""
+        return cls(
+            url or info.get('original_url') or info.get('webpage_url'),
+            platform=platform,
+            id=info.get('id'),
+            title=info.get('title'),
+            duration=info.get('duration'),
+            is_live=bool(info.get('is_live')),
+            language=info.get('language'),
+            size=estimate_transfer_bytes(info),
+            baseline_size=baseline_size,
+            formats=chosen_formats(info),
+            fields={k: info[k] for k in _INFO_FIELDS if info.get(k) is not None},
+        )
+
+    def expired(self, ttl=FORMAT_URL_TTL):
+        return bool(self.formats) and time.time() - self.probed > ttl
+
+    def without_formats(self):
+        """Same estimates, no format URLs: the download extracts the video again."""
+        data = self.to_dict()
+        data['formats'] = ()
+        return MediaRecord.from_dict(data)
+
+    def to_info(self):
+        """Minimal info dict for ``YoutubeDL.process_ie_result``, offering only the chosen formats."""
+        info = dict(self.fields)
+        info.update({
+            'id': self.id,
+            'title': self.title,
+            'duration': self.duration,
+            'is_live': self.is_live,
+            'language': self.language,
+            'formats': [dict(f) for f in self.formats],
+        })
+        return info
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def __repr__(self):
+        return f"MediaRecord({self.platform!r}, {self.id!r}, formats={len(self.formats)})"
@@ -0,0 +1,167 @@
+"""
+Automatic Whisper model and segment-size selection.
+
+Every transcription records its model, audio length, wall-clock time and
+the CPU threads it had into ``output/catalog.db``. From that history the
+real-time factor (RTF, seconds of work per second of audio) of each model
+on this host is estimated, starting from the static planning figures and
+moving towards the measurements as jobs complete.
+
+``--model auto`` then picks the most accurate model that fits the job's
+limits: its deadline (``--deadline`` or a ``deadline=`` in the batch file),
+the ``--max-cpu`` budget, and otherwise the media's own duration. Segment
+size is chosen so that each part finishes in a few minutes, giving regular
+incremental output on slow models and few splits on fast ones.
+"""
+
+import os
+import sqlite3
+import time
+
+from .cascade import CASCADE, cascade_rtf
+from .catalog import DEFAULT_CATALOG, ThreadLocalConnection
+from .planner import WHISPER_CPU_RTF
+from .time_ranges import format_timestamp
+
+AUTO = 'auto'
+# Most accurate first
+CANDIDATES = ('large', 'medium', CASCADE, 'small', 'base', 'tiny')
+# Used when the audio length is unknown, so no limit can be checked
+UNKNOWN_DURATION_MODEL = 'base'
+
+# Weight of the static estimate, in jobs; measurements take over after a few runs
+PRIOR_WEIGHT = 2
+HISTORY_LIMIT = 20
+# Whisper does not scale linearly with threads: each extra thread adds about half of one
+THREAD_EFFICIENCY = 0.5
+# Without a deadline a job should not take longer than the media plays
+DEFAULT_REALTIME = 1.0
+# Wall-clock time aimed at per audio part
+PART_SECONDS = 300
+MIN_SEGMENT_MINUTES = 5
+MAX_SEGMENT_MINUTES = 30
+
+
+def speedup(threads):
+    return 1 + THREAD_EFFICIENCY * (max(1, threads) - 1)
+
+
+class TranscribeHistory:
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = ThreadLocalConnection(self.path)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS transcriptions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model TEXT NOT NULL,
+                audio_seconds REAL NOT NULL,
+                seconds REAL NOT NULL,
+                threads INTEGER NOT NULL,
+                segment_minutes REAL,
+                created REAL NOT NULL
+            )""")
+        self._connect().execute("CREATE INDEX IF NOT EXISTS transcriptions_model ON transcriptions (model, created)")
+
+    def _connect(self):
+        return self._db.get()
+
+    def record(self, model, audio_seconds, seconds, threads, segment_minutes=None):
+        self._connect().execute(
+            "INSERT INTO transcriptions (model, audio_seconds, seconds, threads, segment_minutes, created) "
+            "VALUES (?, ?, ?, ?, ?, ?)", (model, audio_seconds, seconds, threads, segment_minutes, time.time()))
+
+    def recent(self, model, limit=HISTORY_LIMIT):
+        """``(audio_seconds, seconds, threads)`` of the latest runs of ``model``."""
+        return self._connect().execute(
+            "SELECT audio_seconds, seconds, threads FROM transcriptions WHERE model = ? AND audio_seconds > 0 "
+            "ORDER BY created DESC LIMIT ?", (model, limit)).fetchall()
+
+    def close(self):
+        self._db.close()
+
+
+class ModelSelector:
+    def __init__(self, history=None, workers=1, cpu_budget=None, deadline=None, cores=None, deadline_at=None):
+        self.history = history
+        self.workers = max(1, workers or 1)
+        self.cpu_budget = cpu_budget  # estimated CPU seconds per job (as --max-cpu)
+        self.deadline = deadline  # wall-clock seconds per job
+        self.cores = cores or os.cpu_count() or 1
+        self.deadline_at = deadline_at  # time.monotonic() by which this job must be done
+
+    def until(self, deadline_at):
+        """The same selector for one job that must finish by ``deadline_at`` (monotonic clock)."""
+        return ModelSelector(self.history, self.workers, self.cpu_budget, self.deadline, self.cores, deadline_at)
+
+    @property
+    def threads(self):
+        # Concurrent jobs share the cores
+        return max(1, self.cores // self.workers)
+
+    def wall_rtf(self, model):
+        """Estimated wall-clock seconds per second of audio for ``model`` with this job's threads."""
+        prior = cascade_rtf(model, WHISPER_CPU_RTF) / speedup(self.threads)
+        runs = self.history.recent(model) if self.history is not None else []
+        # Runs made with other thread counts are scaled to this one
+        measured = [seconds / audio * speedup(threads) / speedup(self.threads) for audio, seconds, threads in runs]
+        return (prior * PRIOR_WEIGHT + sum(measured)) / (PRIOR_WEIGHT + len(measured))
+
+    def cpu_rtf(self, model):
+        """Estimated CPU seconds per second of audio, in the units of ``--max-cpu``."""
+        return self.wall_rtf(model) * speedup(self.threads)
+
+    def time_limit(self, duration):
+        limits = [self.deadline] if self.deadline is not None else []
+        if self.deadline_at is not None:
+            limits.append(self.deadline_at - time.monotonic())
+        if not limits:
+            limits.append(duration * DEFAULT_REALTIME)
+        return max(0.0, min(limits))
+
+    def segment_minutes(self, model):
+        minutes = PART_SECONDS / max(self.wall_rtf(model), 1e-3) / 60
+        return int(max(MIN_SEGMENT_MINUTES, min(MAX_SEGMENT_MINUTES, minutes)))
+
+    def pick(self, duration):
+        """Most accurate model within the limits for ``duration`` seconds; ``None`` if none fits."""
+        if not duration:
+            return UNKNOWN_DURATION_MODEL
+        limit = self.time_limit(duration)
+        for model in CANDIDATES:
+            if duration * self.wall_rtf(model) > limit:
+                continue
+            if self.cpu_budget is not None and duration * self.cpu_rtf(model) > self.cpu_budget:
+                continue
+            return model
+        return None
+
+    def choose(self, duration):
+        """``(model, segment_minutes)`` for ``duration`` seconds of audio."""
+        model = self.pick(duration)
+        if not duration:
+            print(f"🤖 Auto model: {model} (audio length unknown)")
+        elif model is None:
+            model = CANDIDATES[-1]
+            print(f"⚠️ No model fits {format_timestamp(self.time_limit(duration))} for "
+                  f"{format_timestamp(duration)} of audio; using {model} "
+                  f"(~{format_timestamp(duration * self.wall_rtf(model))})")
+        else:
+            print(f"🤖 Auto model: {model} (~{format_timestamp(duration * self.wall_rtf(model))} for "
+                  f"{format_timestamp(duration)} of audio, limit {format_timestamp(self.time_limit(duration))}, "
+                  f"{self.threads} thread(s))")
+        return model, self.segment_minutes(model)
+
+    def planning_rtf(self, model, duration=None):
+        """CPU real-time factor to plan a job with: ``auto`` is resolved to the model it would pick."""
+        if model == AUTO:
+            model = self.pick(duration) or CANDIDATES[-1]
+        return self.cpu_rtf(model)
+
+    def record(self, model, audio_seconds, seconds, segment_minutes=None):
+        if self.history is None or not audio_seconds:
+            return
+        try:
+            self.history.record(model, audio_seconds, seconds, self.threads, segment_minutes)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not record transcription timing: {e}")
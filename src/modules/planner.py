@@ -0,0 +1,114 @@
+"""
+Preflight planning for batches.
+
+Metadata for every URL is extracted concurrently without downloading any
+media. The plan reports the expected transfer size, total audio duration,
+estimated Whisper CPU time per model and the URLs that cannot be
+processed. Each entry keeps a compact :class:`MediaRecord` of its
+metadata so the real run can hand it to the downloader instead of
+extracting again, without holding every full info dict in memory.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .cascade import CASCADE, EXPECTED_ESCALATION, cascade_rtf
+from .format_policy import human_bytes
+from .time_ranges import clip_fraction, format_timestamp
+
+# Rough CPU seconds per second of audio for fp32 inference without a GPU
+WHISPER_CPU_RTF = {
+    'tiny': 0.08,
+    'base': 0.15,
+    'small': 0.5,
+    'medium': 1.5,
+    'large': 3.0,
+}
+
+
+class PlanEntry:
+    def __init__(self, url, platform=None):
+        self.url = url
+        self.platform = platform
+        self.status = 'pending'  # ok | unsupported | dead
+        self.error = None
+        self.info = None
+        self.duration = None
+        self.size = 0
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+
+def job_download_args(mode, transcribe, policy=None):
+    """The ``(mode, policy)`` a job downloads with, so the probe selects the same formats."""
+    if mode == 'combined':
+        return 'video', policy
+    if transcribe:
+        return 'audio', 'transcribe'
+    return mode, policy
+
+
+def probe_entry(url, detect_platform, pool, mode='video', transcribe=False,
+                policy_for=None, min_abr=None, ranges=None):
+    """Extract metadata for one URL and fill a :class:`PlanEntry`."""
+    entry = PlanEntry(url, detect_platform(url))
+    if not entry.platform:
+        entry.status = 'unsupported'
+        entry.error = 'Could not detect platform'
+        return entry
+
+    policy = policy_for(entry.platform) if policy_for else None
+    probe_mode, policy = job_download_args(mode, transcribe, policy)
+    try:
+        with pool.lease(entry.platform) as downloader:
+            entry.info = downloader.probe(url, mode=probe_mode, policy=policy, min_abr=min_abr, compact=True)
+    except Exception as e:
+        entry.status = 'dead'
+        entry.error = str(e).strip().splitlines()[-1] if str(e).strip() else type(e).__name__
+        return entry
+
+    entry.status = 'ok'
+    duration = entry.info.duration
+    fraction = clip_fraction(ranges, duration)
+    if duration:
+        entry.duration = duration * fraction
+    entry.size = int(entry.info.size * fraction)
+    return entry
+
+
+def build_plan(urls, probe, workers=8):
+    """Run ``probe(url)`` for every URL on a thread pool, keeping input order."""
+    urls = [url.strip() for url in urls if url.strip()]
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        return list(pool.map(probe, urls))
+
+
+def print_plan(entries, models=None):
+    models = models or WHISPER_CPU_RTF
+    ok = [e for e in entries if e.ok]
+    unsupported = [e for e in entries if e.status == 'unsupported']
+    dead = [e for e in entries if e.status == 'dead']
+    total_bytes = sum(e.size for e in ok)
+    total_duration = sum(e.duration or 0 for e in ok)
+    unknown_duration = sum(1 for e in ok if not e.duration)
+
+    print(f"\n📋 Plan: {len(entries)} URL(s) — ✅ {len(ok)} ok, "
+          f"🚫 {len(unsupported)} unsupported, 💀 {len(dead)} dead")
+    for e in ok:
+        duration = format_timestamp(e.duration) if e.duration else '--:--:--'
+        title = (e.info.title or '')[:50]
+        print(f"  [{e.platform.upper():8}] {duration}  {human_bytes(e.size):>10}  {title}")
+    print(f"📦 Estimated transfer: {human_bytes(total_bytes)}")
+    note = f" ({unknown_duration} without duration)" if unknown_duration else ""
+    print(f"⏱️ Total audio duration: {format_timestamp(total_duration)}{note}")
+    print("🧠 Estimated Whisper CPU time:")
+    for model, rtf in models.items():
+        print(f"  {model:8} {format_timestamp(total_duration * rtf)}")
+    cascade_cpu = total_duration * cascade_rtf(CASCADE, WHISPER_CPU_RTF)
+    print(f"  {CASCADE:8} {format_timestamp(cascade_cpu)} (if {EXPECTED_ESCALATION:.0%} of the audio escalates)")
+    for e in unsupported + dead:
+        icon = '🚫' if e.status == 'unsupported' else '💀'
+        print(f"{icon} {e.url}: {e.error}")
@@ -0,0 +1,184 @@
+"""
+Output disk quota with LRU eviction.
+
+Before each download the expected size is checked against the output quota
+and a free-space floor, so a job that cannot fit is refused up front
+instead of failing halfway through a long batch. Space in use is read once
+from the catalog and then kept up to date as outputs are added and evicted.
+
+When a quota is set, a background thread evicts the least recently used
+media to make room: intermediate audio first, then video. Transcripts are
+never evicted. Downloads waiting for room block until the evictor frees
+enough or runs out of candidates.
+"""
+
+import os
+import shutil
+import threading
+import time
+
+from .catalog import AUDIO, VIDEO
+from .format_policy import human_bytes
+from .retention import remove_artifact
+
+OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output'))
+
+# Kinds in the order they are given up; transcripts are not listed, so they are kept
+EVICTION_ORDER = (AUDIO, VIDEO)
+DEFAULT_MIN_FREE = 1 << 30
+# Eviction continues down to this fraction of the quota so it does not run for every download
+LOW_WATER = 0.9
+# Outputs younger than this may still be in use by the job that produced them
+MIN_AGE = 600
+
+
+class QuotaManager:
+    def __init__(self, catalog, max_bytes=None, min_free=DEFAULT_MIN_FREE, root=OUTPUT_DIR,
+                 order=EVICTION_ORDER, min_age=MIN_AGE):
+        self.catalog = catalog
+        self.max_bytes = max_bytes
+        self.min_free = min_free or 0
+        self.root = root
+        self.order = order
+        self.min_age = min_age
+        self.used = catalog.usage()
+        self.reserved = 0
+        self.evicted = 0
+        self.freed = 0
+        self._wanted = 0  # bytes waiting downloads need freed
+        self._exhausted = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        if self.evicting:
+            self._thread = threading.Thread(target=self._run, name="quota-evictor", daemon=True)
+            self._thread.start()
+
+    @property
+    def evicting(self):
+        return self.max_bytes is not None
+
+    def _free(self):
+        os.makedirs(self.root, exist_ok=True)
+        return shutil.disk_usage(self.root).free
+
+    def _shortfall(self, needed):
+        """Bytes that must go before ``needed`` more fit (caller holds the lock)."""
+        low_space = self.min_free + self.reserved + needed - self._free()
+        over_quota = self.used + self.reserved + needed - self.max_bytes if self.evicting else 0
+        return max(0, low_space, over_quota)
+
+    def admit(self, needed, timeout=600):
+        """Reserve room for a download of ``needed`` bytes; ``False`` if there is none to be had.
+
+        Pair every successful call with :meth:`release` once the download is over.
+        """
+        needed = needed or 0
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                shortfall = self._shortfall(needed)
+                if not shortfall:
+                    self.reserved += needed
+                    return True
+                if not self.evicting or self._exhausted:
+                    print(f"💾 Not enough room for ~{human_bytes(needed)}: "
+                          f"{human_bytes(shortfall)} short of the quota/free-space limits")
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"💾 Timed out waiting for eviction to free {human_bytes(shortfall)}")
+                    return False
+                self._wanted = max(self._wanted, shortfall)
+                self._cond.notify_all()
+                self._cond.wait(min(remaining, 5))
+
+    def release(self, needed):
+        with self._cond:
+            self.reserved = max(0, self.reserved - (needed or 0))
+
+    def track(self, size):
+        """Account for a new output; wakes the evictor once the quota is exceeded."""
+        with self._cond:
+            self.used += size or 0
+            # New outputs are new candidates
+            self._exhausted = False
+            if self.evicting and self.used > self.max_bytes:
+                self._cond.notify_all()
+
+    def _target(self):
+        """Bytes to free now (caller holds the lock)."""
+        over = self.used - int(self.max_bytes * LOW_WATER) if self.used > self.max_bytes else 0
+        return max(over, self._wanted)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._exhausted or not self._target()):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                target = self._target()
+            freed = self._evict(target)
+            with self._cond:
+                self._wanted = 0
+                if freed < target:
+                    self._exhausted = True
+                    print(f"⚠️ Eviction freed {human_bytes(freed)} of {human_bytes(target)}: "
+                          f"nothing else may be evicted")
+                self._cond.notify_all()
+
+    def _evict(self, target):
+        freed = 0
+        cutoff = time.time() - self.min_age
+        failed = set()  # paths that could not be deleted during this pass
+        for kind in self.order:
+            while freed < target:
+                candidates = [a for a in self.catalog.least_recent(kind, limit=50, created_before=cutoff)
+                              if a.path not in failed]
+                if not candidates:
+                    break
+                # Deletions go in batches between which waiting downloads can be admitted
+                removed = 0
+                for artifact in candidates:
+                    result = self._remove(artifact)
+                    if result is None:
+                        failed.add(artifact.path)
+                        continue
+                    removed += 1
+                    freed += result
+                    if freed >= target:
+                        break
+                with self._cond:
+                    self._cond.notify_all()
+                if not removed:
+                    # Every candidate failed: the same rows would come back, so move on
+                    break
+        return freed
+
+    def _remove(self, artifact):
+        """Bytes freed by evicting ``artifact``, or ``None`` when it could not be deleted."""
+        try:
+            freed = remove_artifact(self.catalog, artifact)
+        except OSError as e:
+            print(f"⚠️ Could not evict {artifact.path}: {e}")
+            self.catalog.touch([artifact.path])  # do not pick it again right away
+            return None
+        with self._cond:
+            self.used = max(0, self.used - freed)
+            self.evicted += 1
+            self.freed += freed
+        print(f"🧹 Evicted {artifact.kind} {os.path.basename(artifact.path)} ({human_bytes(freed)})")
+        return freed
+
+    def summary(self):
+        limit = f" of {human_bytes(self.max_bytes)}" if self.evicting else ""
+        return (f"💾 Output: {human_bytes(self.used)}{limit} in use, {human_bytes(self._free())} free; "
+                f"evicted {self.evicted} file(s), {human_bytes(self.freed)} freed")
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,217 @@
+"""
+Retention rules and background output cleanup.
+
+A :class:`RetentionPolicy` picks catalogued outputs to delete by type, by
+age since last use and/or by a size budget for what is kept. The
+:class:`CleanupWorker` deletes them on its own thread in batches: each
+batch is one catalog transaction, progress is reported after every batch
+and a cancel request takes effect at the next file, so the caller (the GUI
+thread) never blocks on a large output tree.
+"""
+
+import os
+import threading
+import time
+
+from .catalog import AUDIO, TRANSCRIPT, VIDEO
+
+OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output'))
+# Directories holding outputs; state files next to them (catalog, archive, sync marks) are kept
+OUTPUT_SUBDIRS = ('video', 'audio', 'transcribe', 'store')
+
+BATCH_SIZE = 200
+
+
+def _remove_shard_dir(path, root=OUTPUT_DIR):
+    """Drop the directory of ``path`` once empty, unless it is one of the output directories themselves."""
+    directory = os.path.dirname(os.path.abspath(path))
+    tops = [os.path.join(root, name) for name in OUTPUT_SUBDIRS]
+    if not any(directory.startswith(top + os.sep) for top in tops):
+        return
+    try:
+        os.rmdir(directory)
+    except OSError:
+        pass
+
+
+def remove_artifact(catalog, artifact):
+    """Delete one catalogued output and drop it from the catalog.
+
+    The content-store object goes too once no other name uses it. Returns the bytes
+    actually freed (0 while other names still share the content, or when the file was
+    already gone).
+    """
+    existed = os.path.exists(artifact.path)
+    if existed:
+        os.remove(artifact.path)
+    catalog.forget(artifact.path)
+    _remove_shard_dir(artifact.path)
+    obj = artifact.object_path
+    if obj and obj != artifact.path and os.path.exists(obj):
+        if catalog.references(obj) or os.stat(obj).st_nlink > 1:
+            return 0
+        os.remove(obj)
+        _remove_shard_dir(obj)
+    elif not existed:
+        return 0
+    return artifact.size or 0
+
+
+class RetentionPolicy:
+    def __init__(self, kinds=None, older_than=None, keep_bytes=None, sweep=False):
+        self.kinds = tuple(kinds) if kinds else None  # None: every kind
+        self.older_than = older_than  # seconds since last use
+        self.keep_bytes = keep_bytes  # newest outputs kept up to this size
+        self.sweep = sweep  # also delete files the catalog does not know (older layouts)
+
+    @classmethod
+    def everything(cls):
+        return cls(sweep=True)
+
+    def select(self, catalog):
+        """Artifacts this policy deletes, least recently used first."""
+        used_before = time.time() - self.older_than if self.older_than is not None else None
+        artifacts = catalog.oldest_first(self.kinds, used_before)
+        if self.keep_bytes is None:
+            return artifacts
+        # Size budget: keep the most recently used outputs that fit, delete the rest
+        kept = 0
+        selected = []
+        for artifact in reversed(catalog.oldest_first(self.kinds)):
+            kept += artifact.size or 0
+            if kept > self.keep_bytes:
+                selected.append(artifact)
+        selected.reverse()
+        if used_before is None:
+            return selected
+        # Both rules: whatever either of them selects
+        paths = {a.path for a in selected}
+        return selected + [a for a in artifacts if a.path not in paths]
+
+    def describe(self):
+        from .format_policy import human_bytes
+        parts = ["/".join(self.kinds) if self.kinds else "all outputs"]
+        if self.older_than is not None:
+            parts.append(f"unused for {self.older_than / 86400:g} day(s)")
+        if self.keep_bytes is not None:
+            parts.append(f"beyond the newest {human_bytes(self.keep_bytes)}")
+        return ", ".join(parts)
+
+
+# Presets offered by the GUI
+RETENTION_PRESETS = {
+    "Everything": RetentionPolicy.everything(),
+    "Intermediate audio": RetentionPolicy(kinds=(AUDIO,)),
+    "Media older than 7 days": RetentionPolicy(kinds=(AUDIO, VIDEO), older_than=7 * 86400),
+    "Media older than 30 days": RetentionPolicy(kinds=(AUDIO, VIDEO), older_than=30 * 86400),
+    "Media beyond newest 50 GB": RetentionPolicy(kinds=(AUDIO, VIDEO), keep_bytes=50 << 30),
+    "Transcripts older than 90 days": RetentionPolicy(kinds=(TRANSCRIPT,), older_than=90 * 86400),
+}
+
+
+class CleanupWorker:
+    """Runs a retention policy on a background thread.
+
+    ``on_progress(done, total, freed)`` is called after each batch and
+    ``on_done(done, freed, cancelled)`` once at the end, both from the worker thread.
+    """
+
+    def __init__(self, catalog, policy, index=None, root=OUTPUT_DIR, batch_size=BATCH_SIZE,
+                 on_progress=None, on_done=None):
+        self.catalog = catalog
+        self.policy = policy
+        self.index = index
+        self.root = root
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.done = 0
+        self.freed = 0
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="output-cleanup", daemon=True)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _report(self, total):
+        if self.on_progress is not None:
+            self.on_progress(self.done, total, self.freed)
+
+    def _run(self):
+        try:
+            artifacts = self.policy.select(self.catalog)
+            total = len(artifacts)
+            for start in range(0, total, self.batch_size):
+                if self._cancel.is_set():
+                    break
+                self._delete_batch(artifacts[start:start + self.batch_size])
+                self._report(total)
+            if self.policy.sweep and not self._cancel.is_set():
+                self._sweep()
+        except Exception as e:
+            print(f"❌ Cleanup failed: {e}")
+        finally:
+            self.catalog.close()
+            if self.index is not None:
+                self.index.close()
+            if self.on_done is not None:
+                self.on_done(self.done, self.freed, self._cancel.is_set())
+
+    def _delete_batch(self, batch):
+        transcripts = []
+        with self.catalog.transaction():
+            for artifact in batch:
+                if self._cancel.is_set():
+                    break
+                try:
+                    self.freed += remove_artifact(self.catalog, artifact)
+                except OSError as e:
+                    print(f"⚠️ Could not delete {artifact.path}: {e}")
+                    continue
+                self.done += 1
+                if artifact.kind == TRANSCRIPT:
+                    transcripts.append(artifact.path)
+        # The search index shares the database file: update it after the catalog commit
+        if self.index is not None:
+            for path in transcripts:
+                self.index.forget(path)
+
+    def _sweep(self):
+        """Delete files the catalog never knew about, bottom-up, then the emptied directories."""
+        count = 0
+        for name in OUTPUT_SUBDIRS:
+            top = os.path.join(self.root, name)
+            for dirpath, dirnames, filenames in os.walk(top, topdown=False):
+                for filename in filenames:
+                    if self._cancel.is_set():
+                        return
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        self.freed += os.path.getsize(path) if os.stat(path).st_nlink == 1 else 0
+                        os.remove(path)
+                    except OSError as e:
+                        print(f"⚠️ Could not delete {path}: {e}")
+                        continue
+                    if name == 'transcribe' and self.index is not None:
+                        self.index.forget(path)
+                    self.done += 1
+                    count += 1
+                    if count % self.batch_size == 0:
+                        self._report(None)
+                if dirpath != top:
+                    try:
+                        os.rmdir(dirpath)
+                    except OSError:
+                        pass
+        self._report(None)
@@ -0,0 +1,214 @@
+"""
+Batch ordering policies driven by media metadata.
+
+Jobs are ordered before the run using the duration and size from the
+preflight probe:
+
+* ``fifo`` - file order
+* ``sjf``  - shortest estimated job first
+* ``wfq``  - weighted fair queuing across platforms (each platform is a flow)
+* ``edf``  - earliest deadline first; jobs without a deadline follow in SJF order
+
+Service time is estimated as transfer time plus Whisper CPU time, and
+``compare_policies`` simulates every policy on the same jobs so the mean
+and tail completion latencies can be compared before choosing one.
+"""
+
+import time
+
+from .cascade import cascade_rtf
+from .planner import WHISPER_CPU_RTF
+from .time_ranges import format_timestamp
+
+SCHEDULE_POLICIES = ('fifo', 'sjf', 'wfq', 'edf')
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class Job:
+    def __init__(self, url, index=0, info=None, platform=None, duration=None, size=0,
+                 weight=None, deadline=None, key=None):
+        self.url = url
+        self.index = index
+        self.info = info
+        self.platform = platform
+        self.duration = duration
+        self.size = size
+        self.weight = weight
+        self.deadline = deadline  # seconds after batch start
+        self.key = key  # job store key, set for leased jobs
+
+    @classmethod
+    def from_plan_entry(cls, entry, index=0, weight=None, deadline=None):
+        return cls(entry.url, index=index, info=entry.info, platform=entry.platform,
+                   duration=entry.duration, size=entry.size, weight=weight, deadline=deadline)
+
+
+def parse_duration(value):
+    """Parse ``90``, ``90s``, ``30m``, ``2h`` or ``1d`` into seconds (bare numbers are minutes)."""
+    value = value.strip().lower()
+    unit = _UNITS.get(value[-1:])
+    number = value[:-1] if unit else value
+    try:
+        return float(number) * (unit or 60)
+    except ValueError:
+        raise ValueError(f"Invalid duration: {value}") from None
+
+
+def parse_job_line(line):
+    """Split a batch file line into ``(url, attrs)``.
+
+    Lines may carry ``key=value`` tokens after the URL, e.g.
+    ``https://youtu.be/ID deadline=30m weight=2``.
+    """
+    tokens = line.split()
+    if not tokens:
+        return None, {}
+    attrs = {}
+    for token in tokens[1:]:
+        key, sep, value = token.partition('=')
+        if not sep:
+            continue
+        if key == 'deadline':
+            attrs['deadline'] = parse_duration(value)
+        elif key == 'weight':
+            attrs['weight'] = float(value)
+    return tokens[0], attrs
+
+
+def parse_platform_weights(values):
+    """Parse ``platform=weight`` pairs from the command line."""
+    weights = {}
+    for value in values or []:
+        platform, _, weight = value.partition('=')
+        try:
+            weight = float(weight)
+        except ValueError:
+            weight = 0
+        if not platform or weight <= 0:
+            raise ValueError(f"Invalid platform weight: {value}")
+        weights[platform.strip().lower()] = weight
+    return weights
+
+
+def make_cost_fn(bandwidth_mbps=50, model=None, selector=None):
+    """Estimated seconds to finish a job: transfer + Whisper CPU (when transcribing with ``model``).
+
+    With a ``selector`` the CPU part uses measured speeds and resolves ``auto`` per job.
+    """
+    bytes_per_second = bandwidth_mbps * 1e6 / 8
+    rtf = cascade_rtf(model, WHISPER_CPU_RTF) if model else 0
+
+    def cost(job):
+        job_rtf = selector.planning_rtf(model, job.duration) if model and selector is not None else rtf
+        return (job.size or 0) / bytes_per_second + (job.duration or 0) * job_rtf
+
+    return cost
+
+
+def _weighted_fair(jobs, cost, platform_weights):
+    # Start-time fair queuing: every platform is a flow; a job starts at
+    # max(virtual time, previous finish of its flow) and finishes cost/weight later
+    flows = {}
+    for job in jobs:
+        flows.setdefault(job.platform, []).append(job)
+    last_finish = dict.fromkeys(flows, 0.0)
+    virtual_time = 0.0
+    ordered = []
+    while flows:
+        candidates = []
+        for flow, queue in flows.items():
+            job = queue[0]
+            weight = job.weight or platform_weights.get(flow, 1.0)
+            start = max(virtual_time, last_finish[flow])
+            candidates.append((start + cost(job) / weight, start, job.index, flow))
+        finish, start, _, flow = min(candidates)
+        ordered.append(flows[flow].pop(0))
+        if not flows[flow]:
+            del flows[flow]
+        last_finish[flow] = finish
+        virtual_time = start
+    return ordered
+
+
+def order_jobs(jobs, policy='fifo', cost=None, platform_weights=None):
+    """Return ``jobs`` in the order ``policy`` would run them."""
+    cost = cost or make_cost_fn()
+    jobs = list(jobs)
+    if policy == 'fifo':
+        return sorted(jobs, key=lambda j: j.index)
+    if policy == 'sjf':
+        return sorted(jobs, key=lambda j: (cost(j), j.index))
+    if policy == 'wfq':
+        return _weighted_fair(sorted(jobs, key=lambda j: j.index), cost, platform_weights or {})
+    if policy == 'edf':
+        return sorted(jobs, key=lambda j: (j.deadline is None, j.deadline or 0, cost(j), j.index))
+    raise ValueError(f"Unknown schedule policy: {policy}")
+
+
+def latency_stats(completions, deadlines=None):
+    """Mean, p50, p95 and max of completion times (seconds after batch start)."""
+    if not completions:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0, 'missed': 0}
+    ordered = sorted(completions)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    missed = 0
+    if deadlines:
+        missed = sum(1 for done, deadline in zip(completions, deadlines)
+                     if deadline is not None and done > deadline)
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'max': ordered[-1],
+        'missed': missed,
+    }
+
+
+def simulate(ordered_jobs, cost):
+    """Completion time of each job when run back to back on one worker."""
+    clock = 0.0
+    completions = []
+    for job in ordered_jobs:
+        clock += cost(job)
+        completions.append(clock)
+    return completions
+
+
+def compare_policies(jobs, cost, platform_weights=None, policies=SCHEDULE_POLICIES):
+    results = {}
+    for policy in policies:
+        ordered = order_jobs(jobs, policy, cost, platform_weights)
+        completions = simulate(ordered, cost)
+        results[policy] = latency_stats(completions, [job.deadline for job in ordered])
+    return results
+
+
+def print_comparison(results):
+    print("\n🗓️ Simulated completion latency per schedule policy:")
+    print(f"  {'policy':6} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}  missed deadlines")
+    for policy, stats in results.items():
+        print(f"  {policy:6} {format_timestamp(stats['mean']):>9} {format_timestamp(stats['p50']):>9} "
+              f"{format_timestamp(stats['p95']):>9} {format_timestamp(stats['max']):>9}  {stats['missed']}")
+
+
+class LatencyTracker:
+    """Measures real completion latency of a batch run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.completions = []
+        self.deadlines = []
+
+    def done(self, job=None):
+        self.completions.append(time.monotonic() - self.started)
+        self.deadlines.append(job.deadline if job is not None else None)
+
+    def summary(self, policy):
+        stats = latency_stats(self.completions, self.deadlines)
+        return (f"⏱️ Completion latency ({policy}): mean {format_timestamp(stats['mean'])}, "
+                f"p50 {format_timestamp(stats['p50'])}, p95 {format_timestamp(stats['p95'])}, "
+                f"max {format_timestamp(stats['max'])}, missed deadlines {stats['missed']}")
@@ -0,0 +1,82 @@
+"""
+Shared authenticated sessions for cookie-based platforms.
+
+yt-dlp parses ``cookiefile`` again for every YoutubeDL it builds and
+writes the whole file back when the context closes, so concurrent workers
+on the same account race each other and overwrite refreshed cookies.
+The session manager loads each cookie file once into a single
+``YoutubeDLCookieJar`` per platform and installs that jar into every
+pooled YoutubeDL context. Cookies refreshed by any worker are visible to
+all others, and ``save()`` writes them back once at the end of the batch.
+"""
+
+import os
+import threading
+
+from yt_dlp.cookies import YoutubeDLCookieJar
+
+ALL_PLATFORMS = '*'
+
+
+def parse_cookie_files(values):
+    """Parse ``--cookies`` values: ``FILE`` (every platform) or ``PLATFORM=FILE``."""
+    cookie_files = {}
+    for value in values or []:
+        platform, sep, path = value.partition('=')
+        if not sep:
+            platform, path = ALL_PLATFORMS, value
+        platform, path = platform.strip().lower(), path.strip()
+        if not platform or not path:
+            raise ValueError(f"Invalid cookie file: {value}")
+        cookie_files[platform] = path
+    return cookie_files
+
+
+class SessionManager:
+    def __init__(self, cookie_files=None):
+        self.cookie_files = dict(cookie_files or {})
+        self._jars = {}
+        self._lock = threading.Lock()
+
+    def cookie_file(self, platform):
+        return self.cookie_files.get(platform) or self.cookie_files.get(ALL_PLATFORMS)
+
+    def jar(self, platform):
+        """The shared cookie jar for ``platform``, loaded on first use (``None`` without cookies)."""
+        path = self.cookie_file(platform)
+        if not path:
+            return None
+        path = os.path.abspath(os.path.expanduser(path))
+        with self._lock:
+            # Platforms pointing at the same file share one jar
+            jar = self._jars.get(path)
+            if jar is None:
+                jar = YoutubeDLCookieJar(path)
+                if os.path.isfile(path):
+                    jar.load()
+                    print(f"🍪 Loaded {len(jar)} cookie(s) from {path}")
+                else:
+                    print(f"⚠️ Cookie file not found, starting an empty session: {path}")
+                self._jars[path] = jar
+            return jar
+
+    def attach(self, ydl, platform):
+        """Make ``ydl`` read and update the shared jar instead of parsing its own copy.
+
+        Must run before the first request so its HTTP handlers are built with this jar.
+        ``http.cookiejar`` locks every read and update, so workers can share it freely.
+        """
+        jar = self.jar(platform)
+        if jar is not None:
+            ydl.cookiejar = jar
+        return jar is not None
+
+    def save(self):
+        """Persist refreshed cookies back to their files."""
+        with self._lock:
+            jars = list(self._jars.items())
+        for path, jar in jars:
+            try:
+                jar.save()
+            except Exception as e:
+                print(f"⚠️ Failed to save cookies to {path}: {e}")
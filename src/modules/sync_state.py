@@ -0,0 +1,157 @@
+"""
+High-water marks for incremental channel/profile sync.
+
+Channels and profiles list their newest videos first. For every listing (a
+playlist, or one tab of a channel: videos, shorts, streams) the state file
+keeps the IDs of the newest videos known to be fully processed; the next
+sync stops enumerating that listing as soon as it runs into them, so only
+the first page or two of each tab is fetched.
+
+A mark only moves forward over videos that finished successfully: when a
+newer video fails, the mark stops just below it and the video is retried on
+the next run. A video that keeps failing (private, members-only, an upcoming
+premiere) is given up after ``MAX_FAILURES`` runs, and one that planning
+rejected is passed right away, so neither pins the mark for good. Enumerations cut short by ``--playlist-limit`` never advance
+the mark, because the skipped range in between is not done.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from .url_router import route
+
+DEFAULT_STATE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'output', 'sync_state.json'))
+
+# Newest IDs remembered per source; enough to survive a few deleted videos
+MARK_SIZE = 20
+# Known entries seen in a row before enumeration stops (pinned videos come first)
+OVERLAP = 5
+# Sync runs a video may fail in before the mark moves past it anyway
+MAX_FAILURES = 3
+
+
+class SourceRun:
+    def __init__(self, source, marks):
+        self.source = source
+        self.marks = set(marks)
+        self.entries = []  # new entry IDs, newest first
+        self.complete = False  # reached a known item or the end of the listing
+
+
+class SyncState:
+    def __init__(self, path=DEFAULT_STATE, overlap=OVERLAP):
+        self.path = os.path.abspath(path)
+        self.overlap = overlap
+        self.sources = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.sources = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable sync state {self.path}: {e}")
+        self._runs = []
+        self._pending = {}  # media key -> [(run, entry id), ...]
+        self._done = set()
+        self._failed = set()
+        self._lock = threading.Lock()
+
+    def begin(self, source):
+        """Start enumerating one listing (a playlist or a single channel tab); returns its :class:`SourceRun`."""
+        # Keyed on the listing's URL, so a channel's videos, shorts and streams tabs keep separate marks
+        marks = self.sources.get(source, {}).get('marks', [])
+        run = SourceRun(source, marks)
+        self._runs.append(run)
+        if marks:
+            print(f"🔖 Syncing {source} since its last {len(marks)} known video(s)")
+        else:
+            print(f"🔖 First sync of {source}: full enumeration")
+        return run
+
+    def entries(self, run, entries):
+        """Filter flat playlist entries down to new ones, stopping at the high-water mark."""
+        known_in_a_row = 0
+        for entry in entries:
+            entry_id = entry.get('id') or entry.get('url')
+            if entry_id in run.marks:
+                known_in_a_row += 1
+                if known_in_a_row >= min(self.overlap, len(run.marks)):
+                    run.complete = True
+                    return
+                continue
+            known_in_a_row = 0
+            run.entries.append(entry_id)
+            url = entry.get('url') or entry.get('webpage_url')
+            routed = route(url) if url else None
+            with self._lock:
+                # The same video can be listed by several sources (tabs, playlists)
+                self._pending.setdefault(routed.key if routed else url, []).append((run, entry_id))
+            yield entry
+        run.complete = True
+
+    def skip(self, run, entry_id):
+        """An entry that needs no work (e.g. already in the download archive)."""
+        with self._lock:
+            self._done.add((run.source, entry_id))
+
+    def dropped(self, url):
+        """The entry just listed for ``url`` was dropped as a duplicate of a job already taken."""
+        routed = route(url)
+        with self._lock:
+            pending = self._pending.get(routed.key if routed else url)
+            if not pending:
+                return
+            run, entry_id = pending.pop()
+        self.skip(run, entry_id)
+
+    def done(self, url, ok=True):
+        """Report the outcome of a job; successes let the mark move past it, failures are counted."""
+        routed = route(url)
+        with self._lock:
+            for run, entry_id in self._pending.pop(routed.key if routed else url, ()):
+                (self._done if ok else self._failed).add((run.source, entry_id))
+
+    def rejected(self, url):
+        """Planning dropped the job (over budget): nothing will ever run it, let the mark pass."""
+        self.done(url)
+
+    def commit(self):
+        """Advance each source's mark over its oldest run of finished new entries and save."""
+        advanced = 0
+        for run in self._runs:
+            if not run.complete:
+                print(f"⚠️ {run.source}: enumeration did not reach known videos, mark unchanged")
+                continue
+            state = self.sources.setdefault(run.source, {'marks': []})
+            failures = state.get('failures', {})
+            for entry_id in run.entries:
+                if (run.source, entry_id) in self._failed:
+                    failures[entry_id] = failures.get(entry_id, 0) + 1
+            finished = []
+            for entry_id in reversed(run.entries):  # oldest first
+                if (run.source, entry_id) not in self._done:
+                    if failures.get(entry_id, 0) < MAX_FAILURES:
+                        break
+                    print(f"⏩ {run.source}: giving up on {entry_id} after {failures[entry_id]} failed sync(s)")
+                finished.append(entry_id)
+            # Only entries still below the mark need their count
+            state['failures'] = {entry_id: count for entry_id, count in failures.items()
+                                 if entry_id in run.entries and entry_id not in finished}
+            if not state['failures']:
+                del state['failures']
+            if finished:
+                state['marks'] = (finished[::-1] + state['marks'])[:MARK_SIZE]
+                advanced += 1
+            state['synced_at'] = datetime.now().isoformat(timespec='seconds')
+            pending = len(run.entries) - len(finished)
+            if pending:
+                print(f"🔁 {run.source}: {pending} new video(s) not finished, retried next sync")
+        if not self._runs:
+            return advanced
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.sources, f, indent=2)
+        os.replace(tmp, self.path)
+        return advanced
@@ -0,0 +1,86 @@
+"""
+Time-range parsing for clip-level downloads and transcription.
+
+Ranges are ``(start, end)`` tuples in seconds; ``end`` may be ``None``
+meaning "until the end of the media".
+"""
+
+
+def parse_timestamp(value):
+    """Parse ``SS``, ``MM:SS`` or ``HH:MM:SS`` (fractions allowed) into seconds."""
+    value = str(value).strip()
+    if not value:
+        raise ValueError("Empty timestamp")
+    seconds = 0.0
+    for part in value.split(':'):
+        if not part:
+            raise ValueError(f"Invalid timestamp: {value}")
+        try:
+            seconds = seconds * 60 + float(part)
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value}") from None
+    if seconds < 0 or value.count(':') > 2:
+        raise ValueError(f"Invalid timestamp: {value}")
+    return seconds
+
+
+def parse_range(text):
+    """Parse ``START-END`` (either side may be empty) into a ``(start, end)`` tuple."""
+    start_text, sep, end_text = text.strip().partition('-')
+    if not sep:
+        raise ValueError(f"Invalid time range (expected START-END): {text}")
+    start = parse_timestamp(start_text) if start_text.strip() else 0.0
+    end = parse_timestamp(end_text) if end_text.strip() else None
+    if end is not None and end <= start:
+        raise ValueError(f"Time range ends before it starts: {text}")
+    return start, end
+
+
+def parse_ranges(text):
+    """Parse a comma separated list of ranges, sorted by start time."""
+    ranges = [parse_range(chunk) for chunk in text.split(',') if chunk.strip()]
+    if not ranges:
+        raise ValueError("No time ranges given")
+    return sorted(ranges, key=lambda r: r[0])
+
+
+def build_ranges(start=None, end=None, ranges=None):
+    """Combine ``--start/--end`` and ``--ranges`` command-line values, or ``None`` for the full media."""
+    result = parse_ranges(ranges) if ranges else []
+    if start is not None or end is not None:
+        start_s = parse_timestamp(start) if start is not None else 0.0
+        end_s = parse_timestamp(end) if end is not None else None
+        if end_s is not None and end_s <= start_s:
+            raise ValueError("--end must be after --start")
+        result.append((start_s, end_s))
+        result.sort(key=lambda r: r[0])
+    return result or None
+
+
+def clip_length(clip, media_duration=None):
+    start, end = clip
+    if end is None:
+        end = media_duration
+    if end is None:
+        return None
+    if media_duration is not None:
+        end = min(end, media_duration)
+    return max(end - start, 0.0)
+
+
+def clip_fraction(ranges, media_duration):
+    """Share of the media covered by ``ranges`` (1.0 for the full media or unknown duration)."""
+    if not ranges or not media_duration:
+        return 1.0
+    covered = sum(clip_length(clip, media_duration) for clip in ranges)
+    return min(covered / media_duration, 1.0)
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_range(clip):
+    start, end = clip
+    return f"{format_timestamp(start)}-{format_timestamp(end) if end is not None else 'end'}"
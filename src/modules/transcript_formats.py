@@ -0,0 +1,96 @@
+"""
+Timestamped transcript outputs: JSONL, SRT and WebVTT.
+
+Whisper segments are appended next to the ``.txt`` transcript as each audio
+part is transcribed, with their times shifted onto the media timeline, and
+every line is flushed right away. With live segments requested, parts are
+at most ``STREAM_PART_MINUTES`` long, so output lags by minutes rather than
+by a whole part. ``tail -f`` on the ``.jsonl`` file (or a
+player reloading the ``.vtt``) follows a long transcription while it runs.
+"""
+
+import json
+import os
+
+SEGMENT_FORMATS = ('jsonl', 'srt', 'vtt')
+DEFAULT_SEGMENT_FORMATS = SEGMENT_FORMATS
+# Segments only appear when a whole audio part is done: part length cap when they are followed live
+STREAM_PART_MINUTES = 5
+
+
+def parse_segment_formats(value):
+    """``"jsonl,srt"`` -> ``('jsonl', 'srt')``; an empty value or ``none`` turns them off."""
+    if value is None:
+        return DEFAULT_SEGMENT_FORMATS
+    names = [name.strip().lower() for name in value.split(',') if name.strip()]
+    if names in ([], ['none']):
+        return ()
+    unknown = [name for name in names if name not in SEGMENT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown transcript format(s): {', '.join(unknown)} "
+                         f"(choose from {', '.join(SEGMENT_FORMATS)})")
+    return tuple(dict.fromkeys(names))
+
+
+def _timestamp(seconds, separator):
+    ms = int(round(seconds * 1000))
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}"
+
+
+class SegmentWriter:
+    """Appends segments to one file per format; ``paths`` lists the files written."""
+
+    def __init__(self, transcript_path, formats=DEFAULT_SEGMENT_FORMATS):
+        base = os.path.splitext(transcript_path)[0]
+        self.count = 0
+        self._files = {}
+        for name in formats:
+            handle = open(f"{base}.{name}", 'w', encoding='utf-8')
+            if name == 'vtt':
+                handle.write("WEBVTT\n\n")
+                handle.flush()
+            self._files[name] = handle
+
+    @property
+    def paths(self):
+        return [handle.name for handle in self._files.values()]
+
+    def write(self, segments, offset=0.0, **fields):
+        """Append Whisper segments (``start``/``end`` relative to ``offset`` seconds).
+
+        Extra ``fields`` (model, language, ...) are added to every JSONL record.
+        """
+        for segment in segments:
+            text = segment.get('text', '').strip()
+            if not text:
+                continue
+            start = offset + segment['start']
+            end = offset + segment['end']
+            self.count += 1
+            for name, handle in self._files.items():
+                if name == 'jsonl':
+                    record = {'id': self.count, 'start': round(start, 3), 'end': round(end, 3), 'text': text}
+                    record.update(fields)
+                    if 'model' in segment:
+                        # Cascade: which model produced this segment
+                        record['model'] = segment['model']
+                    handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+                elif name == 'srt':
+                    handle.write(f"{self.count}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n")
+                else:
+                    handle.write(f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n")
+                # Readers tail these files: every segment is visible as soon as it is written
+                handle.flush()
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,163 @@
+"""
+Full-text search over transcripts.
+
+Whisper segments are written to an SQLite FTS5 index (in the catalog
+database by default) as each audio part is transcribed, with their start
+and end times on the media's timeline. ``search`` ranks matching segments
+with BM25 and returns the video and the moment it was said.
+
+Segment rows live in a plain table; the FTS5 table is an external-content
+index over it kept in sync by triggers, so re-transcribing one video
+replaces its rows through an indexed delete instead of scanning the corpus.
+"""
+
+import os
+import sqlite3
+import time
+
+from .catalog import DEFAULT_CATALOG, ThreadLocalConnection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    source_url TEXT,
+    platform TEXT,
+    media_id TEXT,
+    title TEXT,
+    model TEXT,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transcript_id INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_transcript ON segments (transcript_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def format_timestamp(ms):
+    seconds, ms = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def _phrase(query):
+    return '"' + query.replace('"', '""') + '"'
+
+
+class SearchHit:
+    __slots__ = ('path', 'source_url', 'platform', 'media_id', 'title', 'start_ms', 'end_ms', 'snippet', 'score')
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+    @property
+    def link(self):
+        """Source URL jumping to the segment where the platform supports it."""
+        if self.platform == 'youtube' and self.media_id:
+            return f"https://youtu.be/{self.media_id}?t={self.start_ms // 1000}"
+        return self.source_url
+
+
+class TranscriptIndex:
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = ThreadLocalConnection(self.path)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self):
+        return self._db.get()
+
+    def begin(self, path, model=None, **fields):
+        """Register a transcript about to be written; drops segments of a previous version."""
+        db = self._connect()
+        path = os.path.abspath(path)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT id FROM transcripts WHERE path = ?", (path,)).fetchone()
+            if row:
+                db.execute("DELETE FROM segments WHERE transcript_id = ?", (row[0],))
+                db.execute("DELETE FROM transcripts WHERE id = ?", (row[0],))
+            cursor = db.execute(
+                "INSERT INTO transcripts (path, source_url, platform, media_id, title, model, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, fields.get('source_url'), fields.get('platform'), fields.get('media_id'),
+                 fields.get('title'), model, time.time()))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return cursor.lastrowid
+
+    def add_segments(self, transcript_id, segments, offset=0.0):
+        """Index Whisper segments (``start``/``end`` in seconds relative to ``offset``)."""
+        rows = [(transcript_id, int((offset + s['start']) * 1000), int((offset + s['end']) * 1000), s['text'].strip())
+                for s in segments if s.get('text', '').strip()]
+        if not rows:
+            return 0
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany("INSERT INTO segments (transcript_id, start_ms, end_ms, text) VALUES (?, ?, ?, ?)", rows)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def forget(self, path):
+        db = self._connect()
+        row = db.execute("SELECT id FROM transcripts WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        if row:
+            db.execute("DELETE FROM segments WHERE transcript_id = ?", (row[0],))
+            db.execute("DELETE FROM transcripts WHERE id = ?", (row[0],))
+
+    def search(self, query, limit=20):
+        """Best matching segments first (BM25). Plain text that is not valid FTS syntax is searched as a phrase."""
+        # Rank inside FTS5 first and join only the top rows; joining every match before
+        # sorting dominates the cost of common words on a large corpus
+        sql = (
+            "SELECT t.path, t.source_url, t.platform, t.media_id, t.title, s.start_ms, s.end_ms, "
+            "hit.snippet, hit.rank FROM ("
+            "  SELECT rowid, snippet(segments_fts, 0, '[', ']', '…', 16) AS snippet, rank "
+            "  FROM segments_fts WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?"
+            ") AS hit JOIN segments s ON s.id = hit.rowid JOIN transcripts t ON t.id = s.transcript_id "
+            "ORDER BY hit.rank")
+        db = self._connect()
+        try:
+            rows = db.execute(sql, (query, limit)).fetchall()
+        except sqlite3.OperationalError:
+            rows = db.execute(sql, (_phrase(query), limit)).fetchall()
+        return [SearchHit(row) for row in rows]
+
+    def count(self):
+        db = self._connect()
+        return (db.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0],
+                db.execute("SELECT COUNT(*) FROM segments").fetchone()[0])
+
+    def close(self):
+        self._db.close()
+
+
+def print_hits(hits):
+    for hit in hits:
+        title = hit.title or os.path.basename(hit.path)
+        print(f"🎯 {format_timestamp(hit.start_ms)}  {title}")
+        print(f"   {hit.snippet}")
+        print(f"   {hit.link or hit.path}")
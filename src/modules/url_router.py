@@ -0,0 +1,260 @@
+"""
+URL routing and canonicalization.
+
+Each URL is parsed once, its host is looked up in a precompiled table and
+the path is matched against per-platform patterns to produce a stable
+``(platform, id)`` key. Variants of the same media (``youtu.be/ID``,
+``m.youtube.com``, ``shorts/``, tracking parameters, ...) share one key,
+so duplicates in a batch collapse into a single job.
+
+Short links (``fb.watch/CODE``, ``vm.tiktok.com/CODE``) carry no media ID.
+``resolve_short`` follows their redirect with HEAD requests, without
+fetching any page, so they collapse with the full URLs of the same media.
+"""
+
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+
+PLATFORM_HOSTS = {
+    'youtube': ('youtube.com', 'youtu.be', 'youtube-nocookie.com'),
+    'facebook': ('facebook.com', 'fb.watch', 'fb.com'),
+    'tiktok': ('tiktok.com',),
+    'x': ('x.com', 'twitter.com'),
+}
+
+# host -> platform; subdomains (www., m., vm., mobile., ...) are resolved by suffix walk
+HOST_TABLE = {host: platform for platform, hosts in PLATFORM_HOSTS.items() for host in hosts}
+
+# One pass over the URL: optional scheme, optional userinfo, host, optional port, path, query
+_URL_PARTS = re.compile(
+    r'^(?:[a-zA-Z][\w+.-]*:)?(?://)?(?:[^@/?#]*@)?(?P<host>[^/?#:]*)(?::\d*)?(?P<path>[^?#]*)(?:\?(?P<query>[^#]*))?')
+
+_YT_ID = r'(?P<id>[\w-]{11})'
+_YT_SHORT_ID = re.compile(r'^/' + _YT_ID)
+_YT_QUERY_ID = re.compile(r'(?:^|&)v=' + _YT_ID)
+_YT_LIST = re.compile(r'(?:^|&)list=(?P<id>[\w-]+)')
+_YT_PATH_ID = re.compile(r'^/(?:shorts|embed|live|v|e)/' + _YT_ID)
+_YT_CHANNEL = re.compile(r'^/(?P<id>@[\w.-]+|channel/[\w-]+|c/[\w.-]+|user/[\w.-]+)(?:/(?P<tab>videos|shorts|streams))?/?$')
+_FB_QUERY_ID = re.compile(r'(?:^|&)v=(?P<id>\d+)')
+_FB_PATH_ID = re.compile(r'^/(?:[\w.-]+/videos/(?:[\w.-]+/)?|reel/)(?P<id>\d+)')
+_TT_VIDEO = re.compile(r'^/@[\w.-]+/(?:video|photo)/(?P<id>\d+)')
+_TT_PROFILE = re.compile(r'^/(?P<id>@[\w.-]+)/?$')
+_X_STATUS = re.compile(r'^/(?:[\w]+|i/web|i)/status(?:es)?/(?P<id>\d+)')
+_X_PROFILE = re.compile(r'^/(?P<id>\w{1,15})/?$')
+
+# Kinds that stand for many videos and are expanded into one job per entry
+COLLECTION_KINDS = ('playlist', 'channel', 'profile')
+
+_X_RESERVED = frozenset(('home', 'explore', 'search', 'i', 'settings', 'notifications', 'messages'))
+
+SHORT_LINK_TIMEOUT = 10
+SHORT_LINK_HOPS = 5
+
+
+class RoutedURL:
+    __slots__ = ('url', 'platform', 'media_id', 'kind', 'canonical')
+
+    def __init__(self, url, platform, media_id, kind, canonical):
+        self.url = url
+        self.platform = platform
+        self.media_id = media_id
+        self.kind = kind  # video | playlist | channel | profile | short | url
+        self.canonical = canonical
+
+    @property
+    def key(self):
+        return self.platform, self.media_id
+
+    def __repr__(self):
+        return f"RoutedURL({self.platform!r}, {self.media_id!r}, kind={self.kind!r})"
+
+
+def lookup_host(host):
+    """Map a hostname to a platform, walking up subdomains (``m.youtube.com`` -> ``youtube.com``)."""
+    while host:
+        platform = HOST_TABLE.get(host)
+        if platform:
+            return platform
+        _, _, host = host.partition('.')
+    return None
+
+
+def _route_youtube(url, host, path, query):
+    if host.endswith('youtu.be'):
+        match = _YT_SHORT_ID.match(path)
+        if match:
+            return _video(url, 'youtube', match['id'])
+        return None
+    if path.startswith('/watch'):
+        match = _YT_QUERY_ID.search(query)
+        if match:
+            return _video(url, 'youtube', match['id'])
+    match = _YT_PATH_ID.match(path)
+    if match:
+        return _video(url, 'youtube', match['id'])
+    if path.startswith('/playlist'):
+        match = _YT_LIST.search(query)
+        if match:
+            return RoutedURL(url, 'youtube', f"playlist:{match['id']}", 'playlist',
+                             f"https://www.youtube.com/playlist?list={match['id']}")
+    match = _YT_CHANNEL.match(path)
+    if match:
+        # Each tab lists different videos: @c/shorts is not a duplicate of @c/videos
+        channel = f"{match['id']}/{match['tab']}" if match['tab'] else match['id']
+        return RoutedURL(url, 'youtube', f"channel:{channel}", 'channel', f"https://www.youtube.com/{channel}")
+    return None
+
+
+def _route_facebook(url, host, path, query):
+    if host.endswith('fb.watch'):
+        code = path.strip('/')
+        return RoutedURL(url, 'facebook', f"short:{code}", 'short', f"https://fb.watch/{code}/") if code else None
+    if path.startswith(('/watch', '/video.php')):
+        match = _FB_QUERY_ID.search(query)
+        if match:
+            return _video(url, 'facebook', match['id'])
+    match = _FB_PATH_ID.match(path)
+    if match:
+        return _video(url, 'facebook', match['id'])
+    return None
+
+
+def _route_tiktok(url, host, path, query):
+    if host.startswith(('vm.', 'vt.')):
+        code = path.strip('/')
+        return RoutedURL(url, 'tiktok', f"short:{code}", 'short', f"https://{host}/{code}/") if code else None
+    match = _TT_VIDEO.match(path)
+    if match:
+        return _video(url, 'tiktok', match['id'])
+    match = _TT_PROFILE.match(path)
+    if match:
+        return RoutedURL(url, 'tiktok', f"profile:{match['id']}", 'profile',
+                         f"https://www.tiktok.com/{match['id']}")
+    return None
+
+
+def _route_x(url, host, path, query):
+    match = _X_STATUS.match(path)
+    if match:
+        return _video(url, 'x', match['id'])
+    match = _X_PROFILE.match(path)
+    if match and match['id'].lower() not in _X_RESERVED:
+        return RoutedURL(url, 'x', f"profile:{match['id'].lower()}", 'profile', f"https://x.com/{match['id']}")
+    return None
+
+
+_CANONICAL_VIDEO = {
+    'youtube': 'https://www.youtube.com/watch?v={}',
+    'facebook': 'https://www.facebook.com/watch/?v={}',
+    'tiktok': 'https://www.tiktok.com/@/video/{}',
+    'x': 'https://x.com/i/status/{}',
+}
+
+_ROUTERS = {
+    'youtube': _route_youtube,
+    'facebook': _route_facebook,
+    'tiktok': _route_tiktok,
+    'x': _route_x,
+}
+
+
+def _video(url, platform, media_id):
+    return RoutedURL(url, platform, media_id, 'video', _CANONICAL_VIDEO[platform].format(media_id))
+
+
+def route(url):
+    """Parse ``url`` once and return a :class:`RoutedURL`, or ``None`` for unsupported URLs."""
+    url = url.strip()
+    if not url:
+        return None
+    parts = _URL_PARTS.match(url)
+    host = parts['host'].lower()
+    platform = lookup_host(host)
+    if not platform:
+        return None
+    path = parts['path'] or '/'
+    routed = _ROUTERS[platform](url, host, path, parts['query'] or '')
+    if routed is None:
+        # Recognised host but unknown path: keep it, keyed on the URL without query/fragment
+        canonical = f"https://{host}{path.rstrip('/')}"
+        routed = RoutedURL(url, platform, f"url:{canonical}", 'url', canonical)
+    return routed
+
+
+def detect_platform(url):
+    routed = route(url)
+    return routed.platform if routed else None
+
+
+def download_url(routed):
+    """URL to hand to yt-dlp: the canonical form for single videos, the original otherwise."""
+    return routed.canonical if routed.kind == 'video' else routed.url
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # urllib turns a redirected HEAD into a GET of the whole page; stop and read Location instead
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_OPENER = urllib.request.build_opener(_NoRedirect)
+
+
+def _redirect(url, timeout):
+    request = urllib.request.Request(url, method='HEAD', headers={'User-Agent': 'Mozilla/5.0'})
+    try:
+        with _OPENER.open(request, timeout=timeout):
+            return None
+    except urllib.error.HTTPError as e:
+        location = e.headers.get('Location')
+        if 300 <= e.code < 400 and location:
+            return urllib.parse.urljoin(url, location)
+        raise
+
+
+def resolve_short(routed, timeout=SHORT_LINK_TIMEOUT):
+    """Route the URL a short link redirects to; ``routed`` itself when it cannot be followed."""
+    url = routed.canonical
+    try:
+        for _ in range(SHORT_LINK_HOPS):
+            url = _redirect(url, timeout)
+            if url is None:
+                break
+            resolved = route(url)
+            if resolved is not None and resolved.kind != 'short':
+                return resolved
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not resolve short link {routed.url}: {e}")
+    return routed
+
+
+def dedupe(urls, seen=None, resolve=None, dropped=None):
+    """Yield ``(url, routed)`` for the first occurrence of each media key.
+
+    Unsupported URLs are yielded with ``routed=None`` so callers can report them.
+    With ``resolve`` (e.g. :func:`resolve_short`), short links are replaced by
+    ``resolve(routed)`` so they share the key of the media they point to.
+    ``dropped(url)`` is called for every URL skipped as a duplicate.
+    """
+    seen = set() if seen is None else seen
+    for url in urls:
+        routed = route(url)
+        if routed is None:
+            yield url, None
+            continue
+        if routed.key in seen:
+            if dropped is not None:
+                dropped(url)
+            continue
+        seen.add(routed.key)
+        if resolve is not None and routed.kind == 'short':
+            routed = resolve(routed)
+            if routed.kind != 'short':
+                if routed.key in seen:
+                    if dropped is not None:
+                        dropped(url)
+                    continue
+                seen.add(routed.key)
+        yield url, routed
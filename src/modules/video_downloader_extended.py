@@ -4,20 +4,48 @@ import os
 import re
 import shutil
 from tqdm import tqdm
-import whisper
 import ssl
 import subprocess
+import tempfile
+from functools import partial
+import time
 from datetime import datetime
+from .audio_archive import DEFAULT_AUDIO_PROFILE, archive_audio, mp3_baseline_bytes
+from .cascade import CascadeTranscriber, load_model
+from .catalog import AUDIO, TRANSCRIPT, VIDEO, mirror_path, shard_dir
+from .content_store import StreamHasher
+from .format_policy import (
+    AUDIO_FORMAT, DEFAULT_FORMAT, build_format_spec, build_transcribe_audio_spec,
+    estimate_selection_bytes, estimate_transfer_bytes, selected_formats,
+)
+from .language import pin_language
+from .media_record import MediaRecord
+from .model_select import AUTO, ModelSelector
+from .time_ranges import clip_fraction, clip_length, format_range
+from .transcript_formats import DEFAULT_SEGMENT_FORMATS, STREAM_PART_MINUTES, SegmentWriter
 
 ssl._create_default_https_context = ssl._create_unverified_context
 
 
 class BaseDownloader:
-    def __init__(self, platform, auto_title=True, cookie_file=None):
+    def __init__(self, platform, auto_title=True, cookie_file=None, sessions=None, archive=None, store=None,
+                 catalog=None, index=None, quota=None):
         self.platform = platform
         self.auto_title = auto_title
         self.cookie_file = cookie_file
+        self.sessions = sessions
+        self.archive = archive
+        self.store = store  # ContentStore: outputs are kept once by hash, names are hardlinks
+        self.catalog = catalog  # Catalog: every kept artifact is indexed
+        self.index = index  # TranscriptIndex: transcript segments for full-text search
+        self.quota = quota  # QuotaManager: room is reserved before each download
+        self._hasher = None
+        self._source = {}  # catalog fields of the media currently being processed
         self._tqdm_bar = None
+        # Long-lived YoutubeDL contexts keyed by their construction options; the
+        # downloader is leased to one worker at a time so they are never shared
+        self._ydl_contexts = {}
+        self._final_paths = []
 
         base_dir = os.path.join(os.path.dirname(__file__), '../..', 'output')
         self.video_dir = os.path.abspath(os.path.join(base_dir, 'video'))
@@ -46,6 +74,8 @@ class BaseDownloader:
         return old_path
 
     def _progress_hook(self, d):
+        if self._hasher is not None:
+            self._hasher.update(d)
         if d['status'] == 'downloading':
             total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
             downloaded_bytes = d.get('downloaded_bytes', 0)
@@ -77,85 +107,275 @@ class BaseDownloader:
         safe_title = "".join(c if c.isalnum() or c in "._-" else "_" for c in title)
         return f"{safe_title}_{ts}.{ext}"
 
-    def download(self, url, mode='video'):
-        print(f"\n▶️ Downloading from: {url}")
-        
-        # Determine mode settings
+    def _probe_duration(self, path):
+        cmd = [
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", path
+        ]
+        try:
+            output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+            return float(output.strip())
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            return None
+
+    def _store_output(self, path):
+        """Move a finished output into the content store; the path stays valid as a hardlink."""
+        if self.store is None:
+            return None
+        digest = self._hasher.digest(path) if self._hasher is not None else None
+        try:
+            return self.store.add(path, digest)
+        except OSError as e:
+            print(f"⚠️ Could not add {path} to the content store: {e}")
+            return None
+
+    def _keep_output(self, kind, path, **fields):
+        """Store a finished output by content and index it in the catalog."""
+        object_path = self._store_output(path)
+        if self.quota is not None and os.path.exists(path):
+            # A name linked to content that was already stored takes no new space
+            shared = object_path and os.stat(path).st_nlink > 2
+            self.quota.track(0 if shared else os.path.getsize(path))
+        if self.catalog is None:
+            return
+        try:
+            self.catalog.record(kind, path, object_path=object_path, **{**self._source, **fields})
+        except Exception as e:
+            print(f"⚠️ Could not index {path} in the catalog: {e}")
+
+    def _record_archive(self, info):
+        if self.archive is None or not info:
+            return
+        try:
+            self.archive.record(info)
+        except OSError as e:
+            print(f"⚠️ Could not record {info.get('id')} in the download archive: {e}")
+
+    def download(self, url, mode='video', policy=None, report=None, min_abr=None, ranges=None, info=None):
+        paths, info = self._download(url, mode, policy=policy, report=report, min_abr=min_abr,
+                                     ranges=ranges, info=info)
+        if not paths:
+            return None
+        self._record_archive(info)
+        return paths[0]
+
+    def _format_settings(self, mode, policy=None, min_abr=None):
+        """Return ``(output_dir, ydl_format, baseline_format, postprocessors, ext)`` for a mode."""
+        baseline_format = None
         if mode == 'audio':
             output_dir = self.audio_dir
-            extract_audio = True
-            audio_format = 'mp3'
-            ydl_format = 'bestaudio/best'
-            postprocessors = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': audio_format,
-                'preferredquality': '192',
-            }]
-            ext = 'mp3'
+            if policy == 'transcribe':
+                ydl_format = build_transcribe_audio_spec(min_abr)
+                baseline_format = AUDIO_FORMAT
+                # Whisper decodes any container itself: keep the stream as downloaded, with no
+                # MP3 transcode; kept audio gets its archival form after transcription
+                postprocessors = []
+                ext = None
+            else:
+                ydl_format = AUDIO_FORMAT
+                postprocessors = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '192',
+                }]
+                ext = 'mp3'
         elif mode == 'best':
             output_dir = self.video_dir
-            extract_audio = False
             ydl_format = 'best'
             postprocessors = []
             ext = 'mp4'
         else:
             output_dir = self.video_dir
-            extract_audio = False
-            ydl_format = 'bestvideo+bestaudio/best'
+            ydl_format = build_format_spec(policy)
+            baseline_format = DEFAULT_FORMAT
             postprocessors = []
             ext = 'mp4'
+        return output_dir, ydl_format, baseline_format, postprocessors, ext
+
+    def _collect_final_path(self, path):
+        self._final_paths.append(path)
+
+    def _ydl(self, ydl_format, postprocessors=(), outtmpl=None, download_ranges=None):
+        """Return a reusable YoutubeDL configured for one call.
+
+        Contexts are created once per postprocessor set (postprocessors and hooks are
+        bound at construction) and keep extractor state, cookies and HTTP connections
+        between downloads; format, output template and ranges are swapped per call.
+        """
+        key = repr(postprocessors)
+        ydl = self._ydl_contexts.get(key)
+        if ydl is None:
+            options = {
+                'format': ydl_format,
+                'quiet': True,
+                'noplaylist': True,
+                'progress_hooks': [self._progress_hook],
+                'postprocessors': list(postprocessors),
+                'post_hooks': [self._collect_final_path],
+            }
+            shared = self.sessions is not None and self.sessions.cookie_file(self.platform)
+            if self.cookie_file and not shared:
+                options['cookiefile'] = self.cookie_file
+            ydl = yt_dlp.YoutubeDL(options)
+            if shared:
+                self.sessions.attach(ydl, self.platform)
+            if self.archive is not None:
+                # Archived videos are skipped before any transfer; a video is only recorded
+                # once its whole job has succeeded (see _record_archive)
+                self.archive.attach(ydl)
+            self._ydl_contexts[key] = ydl
+        else:
+            ydl.params['format'] = ydl_format
+            # Format strings are compiled; selector functions are used as they are
+            ydl.format_selector = ydl_format if callable(ydl_format) else ydl.build_format_selector(ydl_format)
+        if outtmpl:
+            ydl.params['outtmpl'] = {'default': outtmpl}
+        if download_ranges:
+            ydl.params['download_ranges'] = download_ranges
+        else:
+            ydl.params.pop('download_ranges', None)
+        return ydl
+
+    def close(self):
+        """Release pooled YoutubeDL contexts (saves cookies, closes connections)."""
+        for ydl in self._ydl_contexts.values():
+            try:
+                ydl.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close yt-dlp context: {e}")
+        self._ydl_contexts.clear()
+
+    def probe(self, url, mode='video', policy=None, min_abr=None, compact=False):
+        """Extract metadata with the same format selection as ``download`` but fetch no media.
+
+        The returned info dict (or :class:`MediaRecord` with ``compact=True``) can be passed
+        back as ``info=`` to skip a second extraction.
+        Raises yt-dlp errors for dead or unsupported URLs.
+        """
+        _, ydl_format, baseline_format, postprocessors, _ = self._format_settings(mode, policy, min_abr)
+        ydl = self._ydl(ydl_format, postprocessors)
+        info = ydl.extract_info(url, download=False)
+        if info is None:
+            raise ValueError("Already in the download archive")
+        info = ydl.sanitize_info(info, remove_private_keys=False)
+        if not compact:
+            return info
+        # The baseline is measured now; the record no longer holds the formats to measure it later
+        baseline = estimate_selection_bytes(ydl, info, baseline_format) if baseline_format else None
+        return MediaRecord.from_info(info, url=url, platform=self.platform, baseline_size=baseline)
+
+    def _download(self, url, mode='video', policy=None, report=None, min_abr=None, ranges=None, info=None,
+                  keep=True):
+        print(f"\n▶️ Downloading from: {url}")
+        output_dir, ydl_format, baseline_format, postprocessors, ext = self._format_settings(mode, policy, min_abr)
 
-        # Create filename with timestamp
+        # Timestamp plus media ID: unique across parallel workers downloading different videos
         timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        if mode == 'audio':
+        filename = f"{self.platform}_{timestamp}_%(id)s"
+        # platform/date/ID-prefix keeps every directory small
+        output_dir = shard_dir(output_dir, self.platform)
+        if ranges and len(ranges) > 1:
+            # One file per section
+            filename += "_%(section_start)d"
+        if mode == 'audio' and ext is None:
+            # Original stream: its container decides the extension
+            full_path = os.path.join(output_dir, f"{filename}.%(ext)s")
+        elif mode == 'audio':
             # For audio, don't include extension in outtmpl as yt-dlp will add it
-            filename = f"{self.platform}_{timestamp}"
             full_path = os.path.join(output_dir, filename)
         else:
-            filename = f"{self.platform}_{timestamp}.{ext}"
-            full_path = os.path.join(output_dir, filename)
-
-        options = {
-            'format': ydl_format,
-            'quiet': True,
-            'noplaylist': True,
-            'progress_hooks': [self._progress_hook],
-            'postprocessors': postprocessors,
-            'outtmpl': full_path,
-        }
-
-        if self.cookie_file:
-            options['cookiefile'] = self.cookie_file
-
+            full_path = os.path.join(output_dir, f"{filename}.{ext}")
+
+        download_ranges = None
+        if ranges:
+            # Only the requested sections are fetched (ffmpeg seeks on the remote stream)
+            download_ranges = yt_dlp.utils.download_range_func(
+                None, [(start, end if end is not None else float('inf')) for start, end in ranges])
+
+        record = None
+        if isinstance(info, MediaRecord):
+            record, info = info, (info.to_info() if info.formats else None)
+
+        self._final_paths = []
+        self._source = {'source_url': url, 'platform': self.platform}
+        started = time.monotonic()
+        reserved = 0
         try:
-            with yt_dlp.YoutubeDL(options) as ydl:
-                ydl.download([url])
-                # For audio mode, yt-dlp adds .mp3 extension automatically
-                if mode == 'audio':
-                    actual_path = f"{full_path}.{ext}"
+            ydl = self._ydl(ydl_format, postprocessors, outtmpl=full_path, download_ranges=download_ranges)
+            if info is None:
+                info = ydl.extract_info(url, download=False)
+            # extract_info itself returns None for IDs it already finds in the archive
+            if info is None or (self.archive is not None and ydl.in_download_archive(info)):
+                print(f"⏭️ Already in the download archive: {url}")
+                return [], info
+            if report is not None and baseline_format and record is not None:
+                fraction = clip_fraction(ranges, record.duration)
+                selected = int(record.size * fraction)
+                report.record(selected, int((record.baseline_size or 0) * fraction) or selected)
+            elif report is not None and baseline_format:
+                selected = estimate_transfer_bytes(info, ranges)
+                baseline = estimate_selection_bytes(ydl, info, baseline_format)
+                baseline = int(baseline * clip_fraction(ranges, info.get('duration'))) or selected
+                report.record(selected, baseline)
+            if self.quota is not None:
+                # Refuse up front rather than fill the disk halfway through the transfer
+                if record is not None:
+                    needed = int((record.size or 0) * clip_fraction(ranges, record.duration))
                 else:
-                    actual_path = full_path
-                print(f"🎉 Download successful: {actual_path}")
-                return actual_path
+                    needed = estimate_transfer_bytes(info, ranges)
+                if not self.quota.admit(needed):
+                    print(f"❌ Skipping {url}: not enough disk space")
+                    return [], info
+                reserved = needed
+            # Hash while the file is written; outputs that are removed after use are not stored, and
+            # merged or converted outputs are rewritten by ffmpeg, so they are hashed once at the end
+            parts = record.formats if record is not None and record.formats else selected_formats(info)
+            if self.store is not None and keep and not postprocessors and len(parts) < 2:
+                self._hasher = StreamHasher()
+            ydl.process_ie_result(info, download=True)
+            final_paths = list(self._final_paths)
+            self._source.update(media_id=info.get('id'), title=info.get('title'), duration=info.get('duration'),
+                                language=info.get('language'))
+            elapsed = time.monotonic() - started
+            for path in final_paths:
+                print(f"🎉 Download successful: {path}")
+                if keep:
+                    self._keep_output(AUDIO if mode == 'audio' else VIDEO, path, download_seconds=elapsed)
+            return final_paths, info
 
         except Exception as e:
             print(f"❌ Download failed: {e}")
-            return None
-
-    def transcribe(self, url, model_name="base", segment_minutes=30, keep_audio=False):
-        audio_path = self.download(url, mode='audio')
-        if not audio_path:
-            print("❌ Audio download failed.")
-            return None
-
+            return [], None
+        finally:
+            self._hasher = None
+            if reserved:
+                self.quota.release(reserved)
+
+    def _transcribe_audio(self, audio_path, model, final_out, segment_minutes, trim=None, start=0.0,
+                          on_segments=None, language=None):
+        """Split ``audio_path`` into segments and append their text to ``final_out``.
+
+        ``on_segments(segments, offset)`` receives each part's Whisper segments as soon as the
+        part is done, with ``offset`` the part's position in seconds on the media timeline
+        (``start`` is where ``audio_path`` begins on it). Every part is decoded as ``language``;
+        when it is ``None`` the language Whisper detects in the first part is kept for the rest.
+        """
         print("🎬 Splitting audio into segments using ffmpeg...")
         segment_seconds = segment_minutes * 60
-        temp_dir = os.path.join(self.audio_dir, "temp_segments")
-        os.makedirs(temp_dir, exist_ok=True)
-
-        segment_template = os.path.join(temp_dir, "part_%03d.mp3")
+        # Private directory per call so concurrent workers never mix their parts
+        temp_dir = tempfile.mkdtemp(prefix="temp_segments_", dir=self.audio_dir)
+
+        # Parts keep the container of the source so "-c copy" always works
+        part_ext = os.path.splitext(audio_path)[1] or ".mp3"
+        segment_template = os.path.join(temp_dir, f"part_%03d{part_ext}")
+        trim_args = []
+        if trim:
+            # The section could not be fetched on its own: cut it out while splitting
+            start, end = trim
+            trim_args = ["-ss", str(start)] + (["-to", str(end)] if end is not None else [])
         split_cmd = [
-            "ffmpeg", "-i", audio_path, "-f", "segment", "-segment_time", str(segment_seconds),
+            # -vn: the smallest stream may be a muxed one when a platform has no audio-only formats
+            "ffmpeg", *trim_args, "-i", audio_path, "-vn", "-f", "segment", "-segment_time", str(segment_seconds),
             "-c", "copy", segment_template,
             "-hide_banner", "-loglevel", "error"
         ]
@@ -164,45 +384,248 @@ class BaseDownloader:
             subprocess.run(split_cmd, check=True)
         except subprocess.CalledProcessError as e:
             print(f"❌ ffmpeg split failed: {e}")
-            return None
-
-        print(f"🧠 Loading Whisper model: {model_name}")
-        model = whisper.load_model(model_name)
-        transcript_name = os.path.splitext(os.path.basename(audio_path))[0] + ".txt"
-        final_transcript_path = os.path.join(self.transcribe_dir, transcript_name)
-
-        with open(final_transcript_path, 'w', encoding='utf-8') as final_out:
-            parts = sorted([f for f in os.listdir(temp_dir) if f.endswith(".mp3")])
-            for idx, part_file in enumerate(parts, start=1):
-                part_path = os.path.join(temp_dir, part_file)
-                print(f"🧠 Transcribing {part_file} ({idx}/{len(parts)})...")
-                result = model.transcribe(part_path)
-                final_out.write(result['text'].strip() + '\n\n')
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return False
+
+        parts = sorted([f for f in os.listdir(temp_dir) if f.endswith(part_ext)])
+        offset = start
+        for idx, part_file in enumerate(parts, start=1):
+            part_path = os.path.join(temp_dir, part_file)
+            print(f"🧠 Transcribing {part_file} ({idx}/{len(parts)})...")
+            result = model.transcribe(part_path, language=language)
+            language = language or result.get('language')
+            final_out.write(result['text'].strip() + '\n\n')
+            final_out.flush()
+            if on_segments is not None:
+                on_segments(result.get('segments', []), offset)
+                # Stream-copied parts cut at packet boundaries, not exactly at segment_seconds
+                offset += self._probe_duration(part_path) or segment_seconds
 
         shutil.rmtree(temp_dir)
+        return True
 
-        if not keep_audio and os.path.exists(audio_path):
-            os.remove(audio_path)
-            print(f"🗑️ Removed audio file: {audio_path}")
+    def _index_segments(self, transcript_id, segments, offset):
+        try:
+            self.index.add_segments(transcript_id, segments, offset)
+        except Exception as e:
+            print(f"⚠️ Failed to index transcript segments: {e}")
+
+    def _audio_seconds(self, audio_paths, ranges=None, media_duration=None):
+        """Seconds of audio to transcribe; a clip cut out while splitting counts only its own length."""
+        total = 0.0
+        for idx, audio_path in enumerate(audio_paths):
+            length = self._probe_duration(audio_path)
+            clip = ranges[idx] if ranges and idx < len(ranges) else None
+            if clip and clip_length(clip, media_duration) is not None:
+                length = min(length or float('inf'), clip_length(clip, media_duration))
+            total += length or 0.0
+        return total
+
+    def _needs_trim(self, clip_path, clip, media_duration):
+        """True when yt-dlp delivered more than the requested section."""
+        expected = clip_length(clip, media_duration)
+        actual = self._probe_duration(clip_path)
+        if expected is None or actual is None:
+            return False
+        return actual > expected + 2
+
+    def transcribe(self, url, model_name="base", segment_minutes=30, keep_audio=False,
+                   report=None, min_abr=None, ranges=None, info=None,
+                   audio_profile=DEFAULT_AUDIO_PROFILE, audio_report=None,
+                   segment_formats=DEFAULT_SEGMENT_FORMATS, selector=None, live_segments=False):
+        # Only feeds Whisper, so pull the smallest audio that is still good enough.
+        # Kept audio is stored after transcription, once it has its archival form
+        audio_paths, info = self._download(url, mode='audio', policy='transcribe', report=report,
+                                           min_abr=min_abr, ranges=ranges, info=info, keep=False)
+        if not audio_paths:
+            print("❌ Audio download failed.")
+            return None
+        media_duration = info.get('duration') if info else None
+        transcript_path = self._transcribe_files(audio_paths, model_name, segment_minutes, keep_audio,
+                                                 ranges=ranges, media_duration=media_duration,
+                                                 audio_profile=audio_profile, audio_report=audio_report,
+                                                 segment_formats=segment_formats, selector=selector,
+                                                 live_segments=live_segments)
+        if transcript_path:
+            # Only now is the video done: a failed transcription leaves it out of the archive
+            self._record_archive(info)
+        return transcript_path
+
+    def _keep_audio(self, audio_paths, profile, report=None):
+        """Convert transcription audio to its archival profile and keep it."""
+        for audio_path in audio_paths:
+            kept = archive_audio(audio_path, profile)
+            size = os.path.getsize(kept)
+            baseline = mp3_baseline_bytes(self._probe_duration(kept)) or size
+            if report is not None:
+                report.record(size, baseline)
+            self._keep_output(AUDIO, kept)
+            print(f"💾 Kept audio ({profile}): {kept}")
+
+    def _transcribe_files(self, audio_paths, model_name, segment_minutes, keep_audio,
+                          ranges=None, media_duration=None, audio_profile=DEFAULT_AUDIO_PROFILE,
+                          audio_report=None, segment_formats=DEFAULT_SEGMENT_FORMATS, selector=None,
+                          live_segments=False):
+        audio_seconds = None
+        if selector is not None or model_name == AUTO:
+            audio_seconds = self._audio_seconds(audio_paths, ranges, media_duration)
+        if model_name == AUTO:
+            selector = selector or ModelSelector()
+            model_name, segment_minutes = selector.choose(audio_seconds or media_duration or 0)
+        print(f"🧠 Loading Whisper model: {model_name}")
+        model = load_model(model_name)
+        started = time.monotonic()
+        final_transcript_path = mirror_path(audio_paths[0], self.audio_dir, self.transcribe_dir, ".txt")
+        index_segments = None
+        if self.index is not None:
+            # Segments become searchable part by part, while the rest is still transcribing
+            try:
+                transcript_id = self.index.begin(final_transcript_path, model=model_name, **self._source)
+                index_segments = partial(self._index_segments, transcript_id)
+            except Exception as e:
+                print(f"⚠️ Transcript will not be searchable: {e}")
+        writer = SegmentWriter(final_transcript_path, segment_formats)
+        if live_segments and writer.paths:
+            # Asked to follow the segment files: shorter parts, each one more cut that may split a word
+            segment_minutes = min(segment_minutes, STREAM_PART_MINUTES)
+        # One language for the whole file: no detection pass per part, no switching mid-file
+        clip = ranges[0] if ranges else None
+        skip = clip[0] if clip and self._needs_trim(audio_paths[0], clip, media_duration) else 0.0
+        language = pin_language(model, audio_paths[0], metadata=self._source.get('language'), start=skip)
+
+        def on_segments(segments, offset):
+            writer.write(segments, offset, language=language)
+            if index_segments is not None:
+                index_segments(segments, offset)
+
+        with writer, open(final_transcript_path, 'w', encoding='utf-8') as final_out:
+            for idx, audio_path in enumerate(audio_paths):
+                clip = ranges[idx] if ranges and idx < len(ranges) else None
+                trim = None
+                if clip:
+                    final_out.write(f"[{format_range(clip)}]\n")
+                    if self._needs_trim(audio_path, clip, media_duration):
+                        trim = clip
+                if not self._transcribe_audio(audio_path, model, final_out, segment_minutes, trim=trim,
+                                              start=clip[0] if clip else 0.0, on_segments=on_segments,
+                                              language=language):
+                    return None
+        transcribe_seconds = time.monotonic() - started
+        if selector is not None:
+            # Measured speed on this host refines the next automatic choice
+            selector.record(model_name, audio_seconds, transcribe_seconds, segment_minutes)
+
+        if isinstance(model, CascadeTranscriber):
+            print(model.summary())
+
+        if keep_audio:
+            self._keep_audio(audio_paths, audio_profile, audio_report)
+        else:
+            for audio_path in audio_paths:
+                if os.path.exists(audio_path):
+                    os.remove(audio_path)
+                    print(f"🗑️ Removed audio file: {audio_path}")
+
+        # Transcripts are small; they are hashed once after writing
+        for path in [final_transcript_path] + writer.paths:
+            self._keep_output(TRANSCRIPT, path, model=model_name, transcribe_seconds=transcribe_seconds)
 
         print(f"✅ Transcript saved at: {final_transcript_path}")
         return final_transcript_path
 
+    def _extract_local_audio(self, video_path):
+        """Derive an audio file from a downloaded video without touching the network."""
+        base = mirror_path(video_path, self.video_dir, self.audio_dir, "")
+        # Stream copy first: Matroska audio accepts any codec, so no decode is needed
+        copy_path = f"{base}.mka"
+        copy_cmd = [
+            "ffmpeg", "-y", "-i", video_path, "-vn", "-map", "0:a:0", "-c:a", "copy", copy_path,
+            "-hide_banner", "-loglevel", "error"
+        ]
+        try:
+            subprocess.run(copy_cmd, check=True)
+            return copy_path
+        except subprocess.CalledProcessError:
+            if os.path.exists(copy_path):
+                os.remove(copy_path)
+
+        print("⚠️ Audio stream copy failed, decoding to MP3 instead...")
+        mp3_path = f"{base}.mp3"
+        decode_cmd = [
+            "ffmpeg", "-y", "-i", video_path, "-vn", "-c:a", "libmp3lame", "-q:a", "4", mp3_path,
+            "-hide_banner", "-loglevel", "error"
+        ]
+        try:
+            subprocess.run(decode_cmd, check=True)
+            return mp3_path
+        except subprocess.CalledProcessError as e:
+            print(f"❌ ffmpeg audio extraction failed: {e}")
+            return None
+
+    def download_and_transcribe(self, url, model_name="base", segment_minutes=30, keep_audio=False,
+                                policy=None, report=None, ranges=None, info=None,
+                                audio_profile=DEFAULT_AUDIO_PROFILE, audio_report=None,
+                                segment_formats=DEFAULT_SEGMENT_FORMATS, selector=None, live_segments=False):
+        """Fetch the video once and transcribe audio derived from the saved file.
+
+        Returns ``(video_path, transcript_path)``; either may be ``None`` on failure.
+        """
+        video_paths, info = self._download(url, mode='video', policy=policy, report=report,
+                                           ranges=ranges, info=info)
+        if not video_paths:
+            print("❌ Video download failed.")
+            return None, None
+
+        print("🎵 Extracting audio from downloaded video...")
+        audio_paths = []
+        for video_path in video_paths:
+            audio_path = self._extract_local_audio(video_path)
+            if not audio_path:
+                return video_paths[0], None
+            audio_paths.append(audio_path)
+
+        media_duration = info.get('duration') if info else None
+        transcript_path = self._transcribe_files(audio_paths, model_name, segment_minutes, keep_audio,
+                                                 ranges=ranges, media_duration=media_duration,
+                                                 audio_profile=audio_profile, audio_report=audio_report,
+                                                 segment_formats=segment_formats, selector=selector,
+                                                 live_segments=live_segments)
+        if transcript_path:
+            self._record_archive(info)
+        return video_paths[0], transcript_path
+
 
 class FacebookVideoDownloader(BaseDownloader):
-    def __init__(self, auto_title=True, cookie_file=None):
-        super().__init__(platform='facebook', auto_title=auto_title, cookie_file=cookie_file)
+    def __init__(self, auto_title=True, **kwargs):
+        super().__init__(platform='facebook', auto_title=auto_title, **kwargs)
 
 
 class YouTubeDownloader(BaseDownloader):
-    def __init__(self, auto_title=True):
-        super().__init__(platform='youtube', auto_title=auto_title)
+    def __init__(self, auto_title=True, **kwargs):
+        super().__init__(platform='youtube', auto_title=auto_title, **kwargs)
 
 
 class TikTokDownloader(BaseDownloader):
-    def __init__(self, auto_title=True):
-        super().__init__(platform='tiktok', auto_title=auto_title)
+    def __init__(self, auto_title=True, **kwargs):
+        super().__init__(platform='tiktok', auto_title=auto_title, **kwargs)
 
 class XDownloader(BaseDownloader):
-    def __init__(self, auto_title=True):
-        super().__init__(platform='x', auto_title=auto_title)
+    def __init__(self, auto_title=True, **kwargs):
+        super().__init__(platform='x', auto_title=auto_title, **kwargs)
+
+
+DOWNLOADER_CLASSES = {
+    'facebook': FacebookVideoDownloader,
+    'youtube': YouTubeDownloader,
+    'tiktok': TikTokDownloader,
+    'x': XDownloader,
+}
+
+
+def create_downloader(platform, **kwargs):
+    """A downloader for ``platform``; ``kwargs`` are :class:`BaseDownloader` options."""
+    try:
+        cls = DOWNLOADER_CLASSES[platform]
+    except KeyError:
+        raise ValueError(f"Unsupported platform: {platform}") from None
+    return cls(**kwargs)
@@ -0,0 +1,45 @@
+import hashlib
+import os
+
+from src.modules.content_store import StreamHasher
+
+
+def _download(tmp_path, chunks):
+    """Replay the progress events yt-dlp's HTTP downloader emits while writing ``chunks``."""
+    final = str(tmp_path / "video.mp4")
+    part = final + ".part"
+    hasher = StreamHasher()
+    written = 0
+    with open(part, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+            written += len(chunk)
+            hasher.update({'status': 'downloading', 'downloaded_bytes': written, 'total_bytes': None,
+                           'tmpfilename': part, 'filename': final})
+    os.rename(part, final)
+    # 'finished' carries the final filename only (yt_dlp/downloader/http.py, fragment.py)
+    hasher.update({'status': 'finished', 'downloaded_bytes': written, 'total_bytes': written,
+                   'filename': final, 'elapsed': 0.1})
+    return hasher, final
+
+
+def test_digest_from_progress_events(tmp_path):
+    chunks = [b"a" * 1000, b"b" * 5000, b"c" * 10]
+    hasher, final = _download(tmp_path, chunks)
+    assert hasher.digest(final) == hashlib.sha256(b"".join(chunks)).hexdigest()
+    assert not hasher._files
+
+
+def test_bytes_after_last_progress_event_are_hashed(tmp_path):
+    final = str(tmp_path / "audio.m4a")
+    part = final + ".part"
+    hasher = StreamHasher()
+    with open(part, "wb") as f:
+        f.write(b"head")
+    hasher.update({'status': 'downloading', 'downloaded_bytes': 4, 'tmpfilename': part, 'filename': final})
+    with open(part, "ab") as f:
+        f.write(b"tail")
+    os.rename(part, final)
+    hasher.update({'status': 'finished', 'downloaded_bytes': 8, 'total_bytes': 8, 'filename': final})
+    assert hasher.digest(final) == hashlib.sha256(b"headtail").hexdigest()
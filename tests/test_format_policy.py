@@ -0,0 +1,37 @@
+from src.modules.format_policy import build_format_spec, build_transcribe_audio_spec
+
+
+def _pick(formats, min_abr=None):
+    return [f['format_id'] for f in build_transcribe_audio_spec(min_abr)({'formats': formats})]
+
+
+def _audio(format_id, abr, acodec='opus', filesize=None):
+    return {'format_id': format_id, 'vcodec': 'none', 'acodec': acodec, 'abr': abr, 'filesize': filesize}
+
+
+def test_smallest_audio_above_floor_regardless_of_codec():
+    # YouTube without itag 139: the default sort would prefer AAC 140
+    formats = [_audio('249', 50, filesize=1_900_000), _audio('250', 70, filesize=2_600_000),
+               _audio('140', 129, 'mp4a.40.2', filesize=4_800_000), _audio('251', 135, filesize=5_000_000)]
+    assert _pick(formats) == ['249']
+
+
+def test_bitrate_orders_streams_without_size():
+    formats = [_audio('hls-64', 64, 'mp4a.40.2'), _audio('dash-40', 40), _audio('hls-24', 24, 'mp4a.40.5')]
+    assert _pick(formats) == ['dash-40']
+
+
+def test_closest_below_floor():
+    assert _pick([_audio('a', 16), _audio('b', 24)], min_abr=32) == ['b']
+
+
+def test_smallest_muxed_without_audio_only_streams():
+    formats = [{'format_id': '22', 'vcodec': 'avc1', 'acodec': 'mp4a', 'tbr': 1500},
+               {'format_id': '18', 'vcodec': 'avc1', 'acodec': 'mp4a', 'tbr': 600}]
+    assert _pick(formats) == ['18']
+
+
+def test_muxed_preference_keeps_the_capped_height():
+    spec = build_format_spec('720p')
+    assert spec.split('/')[0] == 'best[vcodec!=none][acodec!=none][height>=720][height<=?720]'
+    assert 'bestvideo[height<=?720]+bestaudio' in spec.split('/')
@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip('yt_dlp')
+
+from src.modules.expansion import DownloadArchive, PlaylistExpander  # noqa: E402
+from src.modules.sync_state import MAX_FAILURES, SyncState  # noqa: E402
+from src.modules.url_router import route  # noqa: E402
+
+CHANNEL = "https://www.youtube.com/@chan"
+
+
+def _videos(prefix, count):
+    return [{'_type': 'url', 'ie_key': 'Youtube', 'id': f"{prefix}{i:010d}",
+             'url': f"https://www.youtube.com/watch?v={prefix}{i:010d}"} for i in range(count)]
+
+
+class FakeYDL:
+    """Channel home page as current yt-dlp returns it: one nested playlist per tab."""
+
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.listed = []
+
+    def extract_info(self, url, download=False, process=False, ie_key=None):
+        if url == CHANNEL:
+            return {'_type': 'playlist', 'entries': [
+                {'_type': 'url', 'ie_key': 'YoutubeTab', 'url': f"{CHANNEL}/{name}"} for name in self.tabs]}
+        name = url.rsplit('/', 1)[1]
+
+        def entries():
+            for entry in self.tabs[name]:
+                self.listed.append(entry['id'])
+                yield entry
+        return {'_type': 'playlist', 'entries': entries()}
+
+
+def _sync(tmp_path, tabs):
+    state = SyncState(str(tmp_path / "state.json"), overlap=2)
+    expander = PlaylistExpander(sync=state)
+    ydl = FakeYDL(tabs)
+    expander._ydl = lambda platform: ydl
+    urls = list(expander.expand(route(CHANNEL)))
+    for url in urls:
+        state.done(url)
+    state.commit()
+    return urls, ydl.listed
+
+
+def test_each_tab_stops_at_its_own_mark(tmp_path):
+    tabs = {'videos': _videos('v', 30), 'shorts': _videos('s', 5), 'streams': _videos('l', 3)}
+    urls, _ = _sync(tmp_path, tabs)
+    assert len(urls) == 38
+
+    tabs['shorts'] = _videos('n', 2) + tabs['shorts']
+    tabs['streams'] = _videos('m', 1) + tabs['streams']
+    urls, listed = _sync(tmp_path, tabs)
+    assert [url[-11:] for url in urls] == ['n0000000000', 'n0000000001', 'm0000000000']
+    # Unchanged videos tab: stopped after the overlap instead of closing the whole channel
+    assert listed[:2] == ['v0000000000', 'v0000000001']
+    assert 'v0000000002' not in listed
+
+
+def test_mark_passes_an_entry_that_keeps_failing(tmp_path):
+    path = str(tmp_path / "state.json")
+    listing = _videos('v', 3)
+
+    def run(ok):
+        state = SyncState(path, overlap=2)
+        sync_run = state.begin(CHANNEL)
+        for entry in state.entries(sync_run, listing):
+            state.done(entry['url'], ok(entry['id']))
+        state.commit()
+        return SyncState(path).sources[CHANNEL]
+
+    stuck = 'v0000000001'
+    for attempt in range(1, MAX_FAILURES):
+        source = run(lambda entry_id: entry_id != stuck)
+        assert source['marks'] == ['v0000000002']
+        assert source['failures'] == {stuck: attempt}
+    source = run(lambda entry_id: entry_id != stuck)
+    assert source['marks'] == ['v0000000000', stuck, 'v0000000002']
+    assert 'failures' not in source
+
+
+def test_rejected_entry_does_not_hold_the_mark(tmp_path):
+    state = SyncState(str(tmp_path / "state.json"))
+    sync_run = state.begin(CHANNEL)
+    entries = list(state.entries(sync_run, _videos('v', 2)))
+    state.rejected(entries[0]['url'])
+    state.done(entries[1]['url'])
+    state.commit()
+    assert state.sources[CHANNEL]['marks'] == ['v0000000000', 'v0000000001']
+
+
+def test_archive_records_only_when_asked(tmp_path):
+    path = str(tmp_path / "archive.txt")
+    archive = DownloadArchive(path)
+    info = {'id': 'v0000000000', 'extractor_key': 'Youtube'}
+    assert 'youtube v0000000000' not in archive
+    archive.record(info)
+    archive.record(info)
+    assert 'youtube v0000000000' in archive
+    assert open(path, encoding='utf-8').read() == 'youtube v0000000000\n'
+    assert 'youtube v0000000000' in DownloadArchive(path)
@@ -0,0 +1,16 @@
+from src.modules.url_router import dedupe, route
+
+
+def test_channel_tabs_keep_separate_keys():
+    keys = {route(f"https://www.youtube.com/@chan{tab}").key
+            for tab in ('', '/', '/videos', '/shorts', '/streams')}
+    assert keys == {('youtube', 'channel:@chan'), ('youtube', 'channel:@chan/videos'),
+                    ('youtube', 'channel:@chan/shorts'), ('youtube', 'channel:@chan/streams')}
+    assert route("https://m.youtube.com/@chan/shorts/").canonical == "https://www.youtube.com/@chan/shorts"
+
+
+def test_video_variants_collapse():
+    urls = ["https://youtu.be/dQw4w9WgXcQ?si=x", "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ", "https://www.youtube.com/@chan/shorts"]
+    assert [routed.key for _, routed in dedupe(urls)] == [('youtube', 'dQw4w9WgXcQ'),
+                                                         ('youtube', 'channel:@chan/shorts')]
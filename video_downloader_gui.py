@@ -10,37 +10,29 @@ from threading import Thread
 import os
 import subprocess
 import platform
-from src.modules.video_downloader_extended import FacebookVideoDownloader, YouTubeDownloader, TikTokDownloader, XDownloader
-
-def detect_platform(url):
-    """Detect social media platform from URL"""
-    if "facebook.com" in url:
-        return "facebook"
-    elif "youtube.com" in url or "youtu.be" in url:
-        return "youtube"
-    elif "tiktok.com" in url:
-        return "tiktok"
-    elif "twitter.com" in url or "x.com" in url:
-        return "x"
-    else:
-        return None
-
-def get_downloader(platform):
-    """Get appropriate downloader for platform"""
-    if platform == "facebook":
-        return FacebookVideoDownloader()
-    elif platform == "youtube":
-        return YouTubeDownloader()
-    elif platform == "tiktok":
-        return TikTokDownloader()
-    elif platform == "x":
-        return XDownloader()
-    else:
-        raise ValueError(f"Unsupported platform: {platform}")
+from src.modules.downloader_pool import DownloaderPool
+from src.modules.format_policy import FORMAT_POLICIES, TransferReport, human_bytes, resolve_policy
+from src.modules.url_router import detect_platform
+from src.modules.expansion import PlaylistExpander
+from src.modules.content_store import ContentStore
+from src.modules.catalog import Catalog
+from src.modules.transcript_index import TranscriptIndex
+from src.modules.model_select import AUTO, ModelSelector, TranscribeHistory
+from src.modules.quota import QuotaManager
+from src.modules.retention import RETENTION_PRESETS, CleanupWorker
+from src.modules.ingest import IngestStats, SeenSet, count_lines, iter_lines, open_source, stream_jobs
 
 class ModernDownloaderApp:
     def __init__(self, master):
         self.master = master
+        self.catalog = Catalog()
+        self.index = TranscriptIndex()
+        # Timings of every transcription feed the "auto" model choice and the speed hints
+        self.selector = ModelSelector(TranscribeHistory())
+        # No quota in the GUI: only the free-space check before each download
+        self.pool = DownloaderPool(store=ContentStore(), catalog=self.catalog, index=self.index,
+                                   quota=QuotaManager(self.catalog))
+        self.cleanup = None
         self.setup_window()
         self.create_styles()
         self.create_widgets()
@@ -413,13 +405,15 @@ class ModernDownloaderApp:
         modes = [
             ("🎬 Video", "video", "Download full video with audio"),
             ("🎵 Audio Only", "audio", "Extract audio as MP3"),
-            ("⭐ Best Quality", "best", "Highest quality available")
+            ("⭐ Best Quality", "best", "Highest quality available"),
+            ("🎬🧠 Video + Transcript", "combined", "One download, transcribed locally")
         ]
         
         for i, (text, value, description) in enumerate(modes):
+            row = i // 3
             col = i % 3
             mode_col = ttk.Frame(mode_options_frame)
-            mode_col.grid(row=0, column=col, padx=10, sticky="w")
+            mode_col.grid(row=row, column=col, padx=10, pady=(0, 5), sticky="w")
             
             ttk.Radiobutton(mode_col, text=text, variable=self.mode_var, 
                            value=value, command=self.on_mode_change).pack(anchor="w")
@@ -429,6 +423,20 @@ class ModernDownloaderApp:
         mode_options_frame.columnconfigure(1, weight=1)
         mode_options_frame.columnconfigure(2, weight=1)
         
+        # Format policy (caps resolution/bitrate to save bandwidth)
+        policy_frame = ttk.Frame(mode_frame)
+        policy_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(policy_frame, text="Format Policy:", font=("SF Pro Text", 10, "bold")).pack(side=tk.LEFT)
+        self.policy_var = tk.StringVar(value="auto")
+        self.policy_dropdown = ttk.Combobox(policy_frame,
+                                           textvariable=self.policy_var,
+                                           values=["auto"] + sorted(FORMAT_POLICIES),
+                                           state="readonly",
+                                           width=12)
+        self.policy_dropdown.pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(policy_frame, text="(auto = per-platform default)", style="Info.TLabel").pack(side=tk.LEFT, padx=(10, 0))
+        
         # AI Transcription section
         ai_frame = ttk.LabelFrame(settings_frame, text="🧠 AI Transcription", padding="10")
         ai_frame.pack(fill=tk.X, pady=(15, 0))
@@ -454,7 +462,7 @@ class ModernDownloaderApp:
         self.model_var = tk.StringVar(value="base")
         self.model_dropdown = ttk.Combobox(self.model_frame, 
                                           textvariable=self.model_var,
-                                          values=["tiny", "base", "small", "medium", "large"],
+                                          values=["tiny", "base", "small", "medium", "large", "cascade", AUTO],
                                           state="readonly",
                                           width=15)
         self.model_dropdown.pack(anchor="w")
@@ -465,7 +473,9 @@ class ModernDownloaderApp:
             "base": "⚖️ Balanced speed & accuracy (74MB)", 
             "small": "🎯 Good accuracy (244MB)",
             "medium": "🔥 High accuracy (769MB)",
-            "large": "🏆 Best accuracy (1.5GB)"
+            "large": "🏆 Best accuracy (1.5GB)",
+            "cascade": "🪜 base first, medium only for unsure segments",
+            AUTO: "🤖 Most accurate model that finishes within the video's length here"
         }
         
         self.model_info_label = ttk.Label(self.model_frame, 
@@ -561,7 +571,16 @@ class ModernDownloaderApp:
                                             text="🗑️ Clear Output", 
                                             command=self.clear_output,
                                             style="Modern.TButton")
-        self.clear_output_button.pack(side=tk.LEFT)
+        self.clear_output_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Retention rule applied by Clear Output
+        self.retention_var = tk.StringVar(value="Everything")
+        self.retention_dropdown = ttk.Combobox(button_frame,
+                                               textvariable=self.retention_var,
+                                               values=list(RETENTION_PRESETS),
+                                               state="readonly",
+                                               width=28)
+        self.retention_dropdown.pack(side=tk.LEFT)
     
     def on_url_change(self, event=None):
         """Handle URL entry changes"""
@@ -582,6 +601,11 @@ class ModernDownloaderApp:
         mode = self.mode_var.get()
         if mode == "audio":
             self.transcribe_check.config(text="✨ Enable AI transcription (recommended for audio)")
+        elif mode == "combined":
+            # Combined mode always transcribes
+            self.transcribe_var.set(True)
+            self.toggle_ai_options(True)
+            self.transcribe_check.config(text="✨ Enable AI transcription (included in Video + Transcript)")
         else:
             self.transcribe_check.config(text="✨ Enable AI transcription")
     
@@ -598,9 +622,15 @@ class ModernDownloaderApp:
             "base": "⚖️ Balanced speed & accuracy (74MB)", 
             "small": "🎯 Good accuracy (244MB)",
             "medium": "🔥 High accuracy (769MB)",
-            "large": "🏆 Best accuracy (1.5GB)"
+            "large": "🏆 Best accuracy (1.5GB)",
+            "cascade": "🪜 base first, medium only for unsure segments",
+            AUTO: "🤖 Most accurate model that finishes within the video's length here"
         }
-        self.model_info_label.config(text=model_info.get(model, ""))
+        info = model_info.get(model, "")
+        if model != AUTO:
+            # Measured on this machine once a few transcriptions have run
+            info += f" · ~{self.selector.wall_rtf(model):.2f}× real time here"
+        self.model_info_label.config(text=info)
     
     def toggle_ai_options(self, enabled):
         """Enable/disable AI transcription options"""
@@ -661,61 +691,86 @@ class ModernDownloaderApp:
         self.download_button.config(state="disabled")
         
         try:
-            urls = []
+            source = None
+            expander = None
             
             # Get URLs from file or entry
             if self.selected_file:
                 try:
-                    with open(self.selected_file, "r", encoding="utf-8") as f:
-                        urls = [line.strip() for line in f if line.strip()]
+                    # The file is streamed, never loaded; the line count only sizes the progress bar
+                    total_urls = max(1, count_lines(self.selected_file))
+                    source = open_source(self.selected_file)
                 except Exception as e:
                     messagebox.showerror("File Error", f"Failed to read file: {e}")
                     return
+                lines = iter_lines(source)
             else:
                 url = self.url_entry.get().strip()
                 if not url:
                     messagebox.showerror("Input Error", "Please enter a video URL or select a file.")
                     return
-                urls.append(url)
+                lines = [url]
+                total_urls = 1
             
-            if not urls:
-                messagebox.showerror("Input Error", "No valid URLs found.")
-                return
+            # Collapse variants of the same video into one job as lines are read
+            # Playlists and channels turn into their videos page by page
+            stats = IngestStats()
+            expander = PlaylistExpander()
+            jobs = stream_jobs(lines, SeenSet(), stats, expand=expander.expand)
             
             # Process each URL
-            total_urls = len(urls)
-            for i, url in enumerate(urls, 1):
+            combined = self.mode_var.get() == "combined"
+            transcribe_only = self.transcribe_var.get() and not combined
+            report = TransferReport("Transcription audio" if transcribe_only else "Format policy")
+            policy = self.policy_var.get()
+            policy = None if policy == "auto" else policy
+            for job in jobs:
                 # Update progress
-                progress = (i - 1) / total_urls * 100
+                progress = min(stats.lines - 1, total_urls) / total_urls * 100
                 self.progress_var.set(progress)
-                self.progress_info.config(text=f"Processing {i}/{total_urls}")
+                self.progress_info.config(text=f"Processing {stats.lines}/{total_urls}")
                 
                 # Detect platform
-                platform = detect_platform(url)
-                if not platform:
-                    self.status_label.config(text=f"❌ Unsupported URL: {url[:50]}...", 
+                if not job.platform:
+                    self.status_label.config(text=f"❌ Unsupported URL: {job.url[:50]}...", 
                                            foreground="#e74c3c")
                     continue
+                platform, url = job.platform, job.url
                 
                 # Update status
                 self.status_label.config(text=f"⏳ Downloading from {platform.title()}...", 
                                        foreground="#f39c12")
                 
                 try:
-                    downloader = get_downloader(platform)
+                    with self.pool.lease(platform) as downloader:
                     
-                    if self.transcribe_var.get():
-                        result = downloader.transcribe(
-                            url,
-                            model_name=self.model_var.get(),
-                            keep_audio=self.keep_audio_var.get()
-                        )
-                        self.status_label.config(text=f"✅ Transcribed: {platform.title()}", 
-                                               foreground="#27ae60")
-                    else:
-                        result = downloader.download(url, mode=self.mode_var.get())
-                        self.status_label.config(text=f"✅ Downloaded: {platform.title()}", 
-                                               foreground="#27ae60")
+                        if combined:
+                            result = downloader.download_and_transcribe(
+                                url,
+                                model_name=self.model_var.get(),
+                                keep_audio=self.keep_audio_var.get(),
+                                policy=resolve_policy(platform, policy),
+                                report=report,
+                                selector=self.selector
+                            )
+                            self.status_label.config(text=f"✅ Downloaded & transcribed: {platform.title()}", 
+                                                   foreground="#27ae60")
+                        elif self.transcribe_var.get():
+                            result = downloader.transcribe(
+                                url,
+                                model_name=self.model_var.get(),
+                                keep_audio=self.keep_audio_var.get(),
+                                report=report,
+                                selector=self.selector
+                            )
+                            self.status_label.config(text=f"✅ Transcribed: {platform.title()}", 
+                                                   foreground="#27ae60")
+                        else:
+                            result = downloader.download(url, mode=self.mode_var.get(),
+                                                         policy=resolve_policy(platform, policy),
+                                                         report=report)
+                            self.status_label.config(text=f"✅ Downloaded: {platform.title()}", 
+                                                   foreground="#27ae60")
                 
                 except Exception as e:
                     self.status_label.config(text=f"❌ Failed: {str(e)[:50]}...", 
@@ -723,16 +778,29 @@ class ModernDownloaderApp:
                     messagebox.showerror("Download Error", f"Failed to process {url}:\n{str(e)}")
                     continue
             
+            if not stats.jobs:
+                messagebox.showerror("Input Error", "No valid URLs found.")
+                return
+            
             # Final status
             self.progress_var.set(100)
-            self.progress_info.config(text=f"Completed {total_urls} URLs")
+            completed_text = f"Completed {stats.jobs} URLs"
+            if stats.duplicates:
+                completed_text += f" ({stats.duplicates} duplicates skipped)"
+            if report.downloads:
+                completed_text += f"\n{report.summary()}"
+            self.progress_info.config(text=completed_text)
             self.status_label.config(text="🎉 All downloads completed!", 
                                    foreground="#27ae60")
             
             # Show completion message
-            messagebox.showinfo("Success", f"Successfully processed {total_urls} URL(s)!")
+            messagebox.showinfo("Success", f"Successfully processed {stats.jobs} URL(s)!")
             
         finally:
+            if source is not None:
+                source.close()
+            if expander is not None:
+                expander.close()
             # Re-enable button
             self.download_button.config(state="normal")
     
@@ -750,22 +818,44 @@ class ModernDownloaderApp:
             messagebox.showerror("Error", f"Cannot open folder: {e}")
     
     def clear_output(self):
-        """Clear output folder contents"""
-        result = messagebox.askyesno("Confirm", 
-                                   "Are you sure you want to delete all downloaded files?")
-        if result:
-            try:
-                output_path = "output"
-                if os.path.exists(output_path):
-                    import shutil
-                    shutil.rmtree(output_path)
-                    os.makedirs(output_path, exist_ok=True)
-                    os.makedirs(os.path.join(output_path, "video"), exist_ok=True)
-                    os.makedirs(os.path.join(output_path, "audio"), exist_ok=True)
-                    os.makedirs(os.path.join(output_path, "transcribe"), exist_ok=True)
-                messagebox.showinfo("Success", "Output folder cleared!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to clear folder: {e}")
+        """Delete outputs by the selected retention rule on a background worker"""
+        if self.cleanup is not None and self.cleanup.running:
+            # Second click interrupts; the current file finishes, the rest is kept
+            self.cleanup.cancel()
+            self.clear_output_button.config(text="⏳ Stopping...", state="disabled")
+            return
+        if str(self.download_button["state"]) == "disabled":
+            messagebox.showwarning("Busy", "Wait for the current download to finish before cleaning up.")
+            return
+        policy = RETENTION_PRESETS[self.retention_var.get()]
+        result = messagebox.askyesno("Confirm", f"Delete {policy.describe()}?")
+        if not result:
+            return
+        self.clear_output_button.config(text="⏹️ Stop Cleanup")
+        self.retention_dropdown.config(state="disabled")
+        self.download_button.config(state="disabled")
+        self.progress_info.config(text="🧹 Cleaning up...")
+        # Worker callbacks run on its thread; hand them to the Tk event loop
+        self.cleanup = CleanupWorker(
+            self.catalog, policy, index=self.index,
+            on_progress=lambda *args: self.master.after(0, self._on_cleanup_progress, *args),
+            on_done=lambda *args: self.master.after(0, self._on_cleanup_done, *args),
+        ).start()
+    
+    def _on_cleanup_progress(self, done, total, freed):
+        if total:
+            self.progress_var.set(done / total * 100)
+            self.progress_info.config(text=f"🧹 Deleted {done}/{total} files ({human_bytes(freed)} freed)")
+        else:
+            self.progress_info.config(text=f"🧹 Deleted {done} files ({human_bytes(freed)} freed)")
+    
+    def _on_cleanup_done(self, done, freed, cancelled):
+        self.cleanup = None
+        self.clear_output_button.config(text="🗑️ Clear Output", state="normal")
+        self.retention_dropdown.config(state="readonly")
+        self.download_button.config(state="normal")
+        status = "stopped" if cancelled else "finished"
+        self.progress_info.config(text=f"🧹 Cleanup {status}: {done} files deleted, {human_bytes(freed)} freed")
 
 def main():
     """Main application entry point"""
@@ -774,6 +864,10 @@ def main():
     
     # Handle window close
     def on_closing():
+        if app.cleanup is not None:
+            app.cleanup.cancel()
+            app.cleanup.join()
+        app.pool.close()
         root.quit()
         root.destroy()
     